@@ -1,71 +1,53 @@
-from fastapi import FastAPI, UploadFile, File, Form, Depends, HTTPException, status
+from fastapi import FastAPI, UploadFile, File, Form, Depends, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from typing import Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ValidationError
 from datetime import datetime, timedelta
+from functools import partial
 
-import base64
+import json
 import os
-import httpx
-import re
-import io
-
-try:
-    from PIL import Image
-except Exception:  # Pillow not installed
-    Image = None
-
-from database import get_db, init_db
-from models import User, Consultation, MedicalHistory, Doctor, Hospital, NGO, PriorityLevel, ConsultationStatus
+import time
+
+import image_pipeline
+import llm_client
+import password_hashing
+from database import AsyncSessionLocal, close_async_db, get_async_db, get_db, init_db, pool_stats
+from doctor_directory import WEEKDAYS, doctor_directory
+from geo_index import PROVIDER_MODELS, provider_filter, provider_index
+from image_cache import image_cache, make_scope
+from language import (
+    LanguageDriftMonitor,
+    detect_language,
+    language_stats,
+    matches_language,
+    with_system_prompt,
+)
+from llm_scheduler import PRIORITY_REWRITE, PRIORITY_SUMMARY, SchedulerOverloaded, scheduler
+from pagination import keyset_page
+from rate_limit import login_ip_limiter, login_username_limiter, registration_ip_limiter
+from response_cache import create_response_cache, make_key
+from summary_worker import SummaryWorker, fallback_summary
+from triage import BN_SPECIALIZATION_TO_EN, triage
+from upload_storage import InFlightKeys, content_key, create_upload_storage
+from models import User, Consultation, MedicalHistory, Hospital, NGO, PriorityLevel, ConsultationStatus
 from auth import (
-    get_password_hash,
-    verify_password,
     create_access_token,
+    get_current_identity,
     get_current_user,
+    token_claims,
+    user_cache,
+    UserIdentity,
 )
 
 
-def detect_language(text: str) -> str:
-    """Detect whether user text is Bengali or English.
-
-    Returns:
-        "bn" for Bengali, "en" otherwise.
-    """
-    s = (text or "").strip()
-    if not s:
-        return "en"
-
-    bengali_chars = len(re.findall(r"[\u0980-\u09FF]", s))
-    latin_chars = len(re.findall(r"[A-Za-z]", s))
-
-    # If Bengali script is present and is not trivially small, treat as Bengali.
-    if bengali_chars >= 3 and bengali_chars >= latin_chars:
-        return "bn"
-    return "en"
-
-
-def bengali_ratio(text: str) -> float:
-    s = text or ""
-    bn = len(re.findall(r"[\u0980-\u09FF]", s))
-    total_letters = bn + len(re.findall(r"[A-Za-z]", s))
-    return (bn / total_letters) if total_letters else 0.0
-
-
-BN_SPECIALIZATION_TO_EN = {
-    "সাধারণ চিকিৎসা": "General Medicine",
-    "শিশুরোগ": "Pediatrics",
-    "স্ত্রীরোগ": "Gynecology",
-    "চর্মরোগ": "Dermatology",
-    "হৃদরোগ": "Cardiology",
-    "অর্থোপেডিক্স": "Orthopedics",
-    "কান-নাক-গলা": "ENT",
-    "স্নায়ুরোগ": "Neurology",
-    "গ্যাস্ট্রোএন্টারোলজি": "Gastroenterology",
-}
-
 app = FastAPI(title="WeCare - Medical Assistant")
 
 # Allow requests from any origin (for testing)
@@ -76,13 +58,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+LLM_BUSY_DETAIL = "The medical assistant is busy. Please try again shortly."
+
+
+@app.exception_handler(SchedulerOverloaded)
+async def llm_overloaded_handler(request, exc: SchedulerOverloaded):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": LLM_BUSY_DETAIL},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434").rstrip("/")
-OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "qwen3-vl:2b")
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+OLLAMA_HOST = llm_client.pool.label()
+OLLAMA_MODEL = llm_client.OLLAMA_MODEL
+response_cache = create_response_cache()
+upload_storage = create_upload_storage()
+uploads_in_flight = InFlightKeys()
+ADMIN_STATS_TTL = float(os.getenv("ADMIN_STATS_TTL", "10"))  # seconds
+SYNC_MAX_ITEMS = int(os.getenv("SYNC_MAX_ITEMS", "2000"))
+SYNC_CHUNK_SIZE = int(os.getenv("SYNC_CHUNK_SIZE", "200"))
+STATS_WINDOWS = {"24h": timedelta(hours=24), "7d": timedelta(days=7), "30d": timedelta(days=30)}
+admin_stats_cache = {}  # window -> (expires_at, stats)
 os.makedirs("static", exist_ok=True)
 
 
@@ -113,6 +112,7 @@ class ConsultationRequest(BaseModel):
 
 
 class SyncConsultation(BaseModel):
+    client_id: Optional[str] = None
     symptoms: str
     ai_response: str
     priority: str
@@ -128,6 +128,51 @@ def startup():
     init_db()
 
 
+@app.on_event("startup")
+def load_doctor_directory():
+    doctor_directory.load()
+
+
+@app.on_event("startup")
+def load_provider_index():
+    provider_index.load()
+
+
+@app.on_event("startup")
+async def start_llm_client():
+    await llm_client.open_client()
+
+
+@app.on_event("shutdown")
+async def stop_llm_client():
+    await llm_client.close_client()
+
+
+@app.on_event("startup")
+async def start_summary_worker():
+    await summary_worker.start()
+
+
+@app.on_event("shutdown")
+async def stop_summary_worker():
+    await summary_worker.stop()
+
+
+@app.on_event("startup")
+def start_password_hashing():
+    password_hashing.start()
+
+
+@app.on_event("shutdown")
+def stop_password_hashing():
+    password_hashing.shutdown()
+
+
+@app.on_event("shutdown")
+async def close_database():
+    await close_async_db()
+
+
 @app.get("/")
 def root():
     return FileResponse("landing.html")
@@ -163,8 +208,24 @@ def service_worker():
     return FileResponse("service-worker.js")
 
 
+def enforce_rate_limit(limiter, key: str):
+    retry_after = limiter.hit(key)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many attempts. Please try again later.",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
 @app.post("/api/auth/register")
-def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, request: Request, db: AsyncSession = Depends(get_async_db)):
+    enforce_rate_limit(registration_ip_limiter, client_ip(request))
+
     # Validate blood group
     try:
         user_data.validate_blood_group()
@@ -172,30 +233,32 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     # Check if user exists
-    existing = db.query(User).filter(
-        (User.username == user_data.username) | (User.email == user_data.email)
-    ).first()
+    existing = (await db.execute(
+        select(User.id).where(
+            (User.username == user_data.username) | (User.email == user_data.email)
+        ).limit(1)
+    )).first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username or email already registered"
         )
     
-    # Create user
+    # Create user (bcrypt runs on the password hashing pool, not the event loop)
     user = User(
         username=user_data.username,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await password_hashing.hash_password(user_data.password),
         full_name=user_data.full_name,
         phone=user_data.phone,
         blood_group=user_data.blood_group,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    invalidate_admin_stats()
     
     # Create token
-    access_token = create_access_token(data={"sub": user.id})
+    access_token = create_access_token(data=token_claims(user))
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -209,15 +272,32 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
 
 
 @app.post("/api/auth/login")
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == credentials.username).first()
-    if not user or not verify_password(credentials.password, user.hashed_password):
+async def login(credentials: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
+    ip = client_ip(request)
+    enforce_rate_limit(login_ip_limiter, ip)
+    enforce_rate_limit(login_username_limiter, credentials.username.lower())
+
+    user = (await db.execute(
+        select(User).where(User.username == credentials.username)
+    )).scalars().first()
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await password_hashing.verify_and_update(credentials.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
         )
     
-    access_token = create_access_token(data={"sub": user.id})
+    # Only failed attempts count: the IP may be a clinic NAT full of patients
+    login_username_limiter.reset(credentials.username.lower())
+    login_ip_limiter.refund(ip)
+    if new_hash:
+        # Stored hash used an old BCRYPT_ROUNDS; upgrade it now that we know the password
+        user.hashed_password = new_hash
+        await db.commit()
+    
+    access_token = create_access_token(data=token_claims(user))
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -242,79 +322,6 @@ def get_me(current_user: User = Depends(get_current_user)):
     }
 
 
-def analyze_priority(symptoms: str, ai_response: str) -> PriorityLevel:
-    """Analyze symptoms and AI response to determine priority"""
-    critical_keywords = [
-        "chest pain", "heart attack", "stroke", "severe bleeding", "unconscious",
-        "breathing difficulty", "severe pain", "emergency", "critical", "urgent care needed"
-    ]
-    critical_keywords_bn = [
-        "বুকে ব্যথা", "হার্ট অ্যাটাক", "স্ট্রোক", "অতিরিক্ত রক্তপাত", "অজ্ঞান",
-        "শ্বাসকষ্ট", "তীব্র ব্যথা", "জরুরি", "ইমার্জেন্সি"
-    ]
-    high_keywords = [
-        "high fever", "severe", "infection", "fracture", "injury", "wound",
-        "urgent", "immediate", "consult immediately"
-    ]
-    high_keywords_bn = [
-        "উচ্চ জ্বর", "তীব্র", "সংক্রমণ", "হাড় ভাঙা", "আঘাত", "ক্ষত",
-        "দ্রুত", "অবিলম্বে", "তাৎক্ষণিক"
-    ]
-    medium_keywords = [
-        "fever", "pain", "rash", "cough", "headache", "medical attention"
-    ]
-    medium_keywords_bn = [
-        "জ্বর", "ব্যথা", "র‍্যাশ", "কাশি", "মাথাব্যথা", "ডাক্তার"
-    ]
-    
-    text = (symptoms + " " + ai_response).lower()
-    
-    for keyword in critical_keywords:
-        if keyword in text:
-            return PriorityLevel.CRITICAL
-
-    for keyword in critical_keywords_bn:
-        if keyword in text:
-            return PriorityLevel.CRITICAL
-    
-    for keyword in high_keywords:
-        if keyword in text:
-            return PriorityLevel.HIGH
-
-    for keyword in high_keywords_bn:
-        if keyword in text:
-            return PriorityLevel.HIGH
-    
-    for keyword in medium_keywords:
-        if keyword in text:
-            return PriorityLevel.MEDIUM
-
-    for keyword in medium_keywords_bn:
-        if keyword in text:
-            return PriorityLevel.MEDIUM
-    
-    return PriorityLevel.LOW
-
-
-def extract_specialization(ai_response: str) -> Optional[str]:
-    """Extract recommended doctor specialization from AI response"""
-    specializations = [
-        "General Medicine", "Pediatrics", "Gynecology", "Dermatology",
-        "Cardiology", "Orthopedics", "ENT", "Neurology", "Gastroenterology"
-    ]
-    
-    text = ai_response.lower()
-    for spec in specializations:
-        if spec.lower() in text:
-            return spec
-
-    # Bengali labels → English DB values
-    for bn_label, en_value in BN_SPECIALIZATION_TO_EN.items():
-        if bn_label in ai_response:
-            return en_value
-    
-    return None
-
 def build_consultation_prompt(*, language: str, context: str, conversation_history: str, user_part: str) -> str:
     if language == "bn":
         specialization_choices_bn = " / ".join(BN_SPECIALIZATION_TO_EN.keys())
@@ -377,7 +384,10 @@ Keep responses SHORT, practical, and compassionate. Focus on immediate actionabl
 
 
 async def generate_summary(full_response: str, *, language: str) -> str:
-    """Generate a concise summary of the AI response using Ollama in the same language."""
+    """Generate a concise summary of the AI response using Ollama in the same language.
+
+    Raises on connection/HTTP errors so the background worker can retry.
+    """
     if language == "bn":
         summary_prompt = f"""নিচের চিকিৎসা পরামর্শটি ২-৩টি বাক্যে সংক্ষেপ করুন।
 শুধু রোগের ধারণা/জরুরি অবস্থা/করণীয়—এই মূল তথ্যগুলো রাখুন।
@@ -395,43 +405,47 @@ Original response:
 
 Provide ONLY the summary, no additional text:"""
     
-    try:
-        payload = {
-            "model": OLLAMA_MODEL,
-            "prompt": summary_prompt,
-            "stream": False,
-            "options": {"temperature": 0.3}
-        }
-        
-        async with httpx.AsyncClient(timeout=httpx.Timeout(60.0)) as client:
-            res = await client.post(f"{OLLAMA_HOST}/api/generate", json=payload)
-            res.raise_for_status()
-            data = res.json()
-            summary = data.get("response", "").strip()
-            
-            # Limit summary length
-            if len(summary) > 500:
-                summary = summary[:497] + "..."
-            
-            return summary if summary else full_response[:200] + "..."
-    except Exception as e:
-        print(f"Summary generation failed: {e}")
-        # Fallback: return first 200 chars
-        return full_response[:200] + "..."
+    payload = {
+        "model": OLLAMA_MODEL,
+        "prompt": summary_prompt,
+        "stream": False,
+        "options": {"temperature": 0.3}
+    }
+    
+    res = await llm_client.generate(payload, timeout=60.0, priority=PRIORITY_SUMMARY)
+    res.raise_for_status()
+    data = res.json()
+    summary = data.get("response", "").strip()
+    
+    # Limit summary length
+    if len(summary) > 500:
+        summary = summary[:497] + "..."
+    
+    return summary if summary else fallback_summary(full_response)
+
+
+async def summarize_for_storage(full_response: str) -> str:
+    """Summary job used by the background worker; the response's own script decides the language."""
+    return await generate_summary(full_response, language=detect_language(full_response))
+
+
+summary_worker = SummaryWorker(summarize_for_storage)
 
 
 async def enforce_response_language(*, expected_language: str, user_text: str, response_text: str) -> str:
-    """If model responded in the wrong language, ask it once to rewrite in the expected language."""
+    """If model responded in the wrong language, ask it once to rewrite in the expected language.
+
+    This is the last-resort fallback; the system prompt and early stream restart
+    in stream_consultation_answer should make it rare.
+    """
     if not response_text:
         return response_text
 
-    bn_r = bengali_ratio(response_text)
-    looks_bengali = bn_r >= 0.2
-    if expected_language == "bn" and looks_bengali:
-        return response_text
-    if expected_language == "en" and not looks_bengali:
+    language_stats["responses"] += 1
+    if matches_language(response_text, expected_language):
         return response_text
 
+    language_stats["rewrites"] += 1
     if expected_language == "bn":
         rewrite_prompt = f"""আপনার আগের উত্তরটি পুরোপুরি বাংলায় আবার লিখুন। কোনো ইংরেজি শব্দ/বাক্য ব্যবহার করবেন না। অর্থ ও চিকিৎসা পরামর্শ যেন একই থাকে।
 
@@ -460,25 +474,23 @@ Provide ONLY the rewritten English answer."""
             "stream": False,
             "options": {"temperature": 0.2},
         }
-        async with httpx.AsyncClient(timeout=httpx.Timeout(60.0)) as client:
-            res = await client.post(f"{OLLAMA_HOST}/api/generate", json=payload)
-            res.raise_for_status()
-            data = res.json()
-            rewritten = (data.get("response", "") or "").strip()
-            return rewritten if rewritten else response_text
+        res = await llm_client.generate(payload, timeout=60.0, priority=PRIORITY_REWRITE)
+        res.raise_for_status()
+        data = res.json()
+        rewritten = (data.get("response", "") or "").strip()
+        return rewritten if rewritten else response_text
     except Exception:
         return response_text
 
-@app.post("/api/consultation")
-async def create_consultation(
-    symptoms: Optional[str] = Form(None),
-    image: Optional[UploadFile] = File(None),
-    use_history: bool = Form(True),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Main consultation endpoint - works with or without image"""
-
+async def prepare_consultation(
+    *,
+    symptoms: Optional[str],
+    image: Optional[UploadFile],
+    use_history: bool,
+    current_user: User,
+    db: AsyncSession,
+) -> dict:
+    """Validate input, build the prompt and Ollama payload, and store any uploaded image."""
     symptoms_text = (symptoms or "").strip()
     language = detect_language(symptoms_text) if symptoms_text else "bn"  # Bangladesh default for image-only
     if not symptoms_text and image is None:
@@ -487,9 +499,9 @@ async def create_consultation(
     # Build context with medical history if enabled
     context = ""
     if use_history:
-        histories = db.query(MedicalHistory).filter(
-            MedicalHistory.user_id == current_user.id
-        ).all()
+        histories = (await db.execute(
+            select(MedicalHistory).where(MedicalHistory.user_id == current_user.id)
+        )).scalars().all()
         if histories:
             context = "Patient's medical history:\n"
             for h in histories:
@@ -501,9 +513,11 @@ async def create_consultation(
     
     # Add conversation context from last k consultations
     k = 5  # Number of previous consultations to include as context
-    previous_consultations = db.query(Consultation).filter(
-        Consultation.user_id == current_user.id
-    ).order_by(Consultation.created_at.desc()).limit(k).all()
+    previous_consultations = (await db.execute(
+        select(Consultation).where(
+            Consultation.user_id == current_user.id
+        ).order_by(Consultation.created_at.desc()).limit(k)
+    )).scalars().all()
     
     conversation_history = ""
     if previous_consultations:
@@ -527,71 +541,55 @@ async def create_consultation(
         user_part=user_part,
     )
 
-    # Call Ollama
     image_path = None
-    payload = {
+    image_hash = None
+    payload = with_system_prompt({
         "model": OLLAMA_MODEL,
         "prompt": prompt,
         "stream": False,
-    }
+    }, language)
     
     if image:
-        image_bytes = await image.read()
-        if not image_bytes:
-            raise HTTPException(status_code=400, detail="Uploaded image is empty")
-
-        # Normalize to PNG so Ollama gets a known format.
-        if Image is None:
+        if not image_pipeline.available():
             raise HTTPException(
                 status_code=503,
                 detail="Image upload support is not installed on the server (missing Pillow). Install Pillow or submit text-only.",
             )
+        # Size-limited read, then decode/downscale/encode off the event loop
         try:
-            with Image.open(io.BytesIO(image_bytes)) as im:
-                im = im.convert("RGB")
-                out = io.BytesIO()
-                im.save(out, format="PNG")
-                normalized_bytes = out.getvalue()
-        except Exception as exc:
-            raise HTTPException(
-                status_code=400,
-                detail="Unsupported image format. Please upload a PNG or JPG image.",
-            ) from exc
-
-        image_b64 = base64.b64encode(normalized_bytes).decode("utf-8")
-        payload["images"] = [image_b64]
-
-        # Save image (normalized)
-        filename = f"{current_user.id}_{datetime.utcnow().timestamp()}.png"
-        image_path = os.path.join(UPLOAD_DIR, filename)
-        with open(image_path, "wb") as f:
-            f.write(normalized_bytes)
-    
-    try:
-        async with httpx.AsyncClient(timeout=httpx.Timeout(120.0)) as client:
-            res = await client.post(f"{OLLAMA_HOST}/api/generate", json=payload)
-    except httpx.ConnectError as exc:
-        raise HTTPException(
-            status_code=503,
-            detail=f"Could not connect to Ollama at {OLLAMA_HOST}. Is 'ollama serve' running?",
-        ) from exc
-    
-    if res.status_code != 200:
-        raise HTTPException(status_code=res.status_code, detail=res.text)
-    
-    data = res.json()
-    ai_response = (data.get("response", "") or "").strip()
+            raw = await image_pipeline.read_upload(image)
+            processed = await image_pipeline.process(raw)
+        except image_pipeline.ImageTooLarge as exc:
+            raise HTTPException(status_code=413, detail=str(exc)) from exc
+        except image_pipeline.InvalidImage as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        del raw
+
+        payload["images"] = [processed.base64()]
+        image_hash = processed.dhash
+
+        # Save image (normalized) under its content hash; repeats are stored once
+        image_path = content_key(processed.data, processed.extension)
+        await run_in_threadpool(
+            uploads_in_flight.store, image_path, partial(upload_storage.put, image_path, processed.data)
+        )
+
+    return {
+        "symptoms_text": symptoms_text,
+        "language": language,
+        "payload": payload,
+        "image_path": image_path,
+        "image_hash": image_hash,
+        "use_history": use_history,
+    }
+
+
+async def finalize_consultation(prepared: dict, ai_response: str, *, user_id: int, db: AsyncSession) -> dict:
+    """Triage the model answer, store the consultation and build the API response."""
+    symptoms_text = prepared["symptoms_text"]
 
-    # If model disobeys language instruction, rewrite once.
-    ai_response = await enforce_response_language(
-        expected_language=language,
-        user_text=symptoms_text or "(image-only)",
-        response_text=ai_response,
-    )
-    
     # Analyze priority and extract specialization
-    priority = analyze_priority(symptoms_text, ai_response)
-    specialization = extract_specialization(ai_response)
+    priority, specialization = triage(symptoms_text, ai_response)
     
     # Extract first aid from response (simple heuristic)
     first_aid = ""
@@ -600,36 +598,28 @@ async def create_consultation(
         if len(parts) > 1:
             first_aid = "First aid" + parts[1].split("\n\n")[0]
     
-    # Generate summary for storage (keep full response for returning to user)
-    ai_summary = await generate_summary(ai_response, language=language)
-    
-    # Save consultation with summary
+    # Save the full response now; the summary worker replaces it with a summary later
     consultation = Consultation(
-        user_id=current_user.id,
+        user_id=user_id,
         symptoms=symptoms_text,
-        image_path=image_path,
-        ai_response=ai_summary,  # Store summary instead of full response
+        image_path=prepared["image_path"],
+        ai_response=ai_response,
+        summary_pending=True,
         priority=priority,
         first_aid_suggestions=first_aid,
         recommended_specialization=specialization,
-        use_history=use_history,
+        use_history=prepared["use_history"],
         is_synced=True
     )
     db.add(consultation)
-    db.commit()
-    db.refresh(consultation)
-    
-    # Get recommended doctors
-    doctors = []
-    if specialization:
-        doctors = db.query(Doctor).filter(
-            Doctor.specialization == specialization
-        ).limit(3).all()
+    await db.commit()
+    if prepared["image_path"]:
+        uploads_in_flight.release(prepared["image_path"])  # the committed row protects it now
+    invalidate_admin_stats()
+    summary_worker.enqueue(consultation.id)
     
-    if not doctors:
-        doctors = db.query(Doctor).filter(
-            Doctor.specialization == "General Medicine"
-        ).limit(3).all()
+    # Get recommended doctors (in-memory directory, available today and cheapest first)
+    doctors = doctor_directory.recommend(await doctor_directory.snapshot_async(), specialization)
     
     return {
         "consultation_id": consultation.id,
@@ -639,58 +629,360 @@ async def create_consultation(
         "recommended_specialization": specialization,
         "recommended_doctors": [
             {
-                "id": d.id,
-                "name": d.name,
-                "specialization": d.specialization,
-                "hospital": d.hospital,
-                "phone": d.phone,
-                "available_days": d.available_days,
-                "fee": d.fee,
-                "address": d.address
+                "id": d["id"],
+                "name": d["name"],
+                "specialization": d["specialization"],
+                "hospital": d["hospital"],
+                "phone": d["phone"],
+                "available_days": d["available_days"],
+                "fee": d["fee"],
+                "address": d["address"]
             }
             for d in doctors
         ]
     }
 
 
+async def open_consultation_stream(payload: dict) -> llm_client.LLMStream:
+    """Start streaming an answer from Ollama, mapping connection/HTTP failures to HTTP errors."""
+    try:
+        stream = await llm_client.open_stream(payload, timeout=120.0)
+    except llm_client.RETRYABLE_ERRORS as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Could not connect to Ollama at {OLLAMA_HOST}. Is 'ollama serve' running?",
+        ) from exc
+
+    if stream.status_code != 200:
+        detail = await stream.read_text()
+        await stream.close()
+        raise HTTPException(status_code=stream.status_code, detail=detail)
+    return stream
+
+
+async def stream_consultation_answer(prepared: dict, stream: llm_client.LLMStream):
+    """Yield the model answer as ("token", text) events, ending with ("final", text).
+
+    If the first letters show the answer drifting into the wrong language the
+    stream is cancelled and restarted once with a stronger system prompt; a
+    ("reset", "") event tells the caller to discard the tokens seen so far.
+    """
+    language = prepared["language"]
+    restarted = False
+    try:
+        while True:
+            monitor = LanguageDriftMonitor(language)
+            parts = []
+            drifted = False
+            chunks = stream.chunks()
+            try:
+                async for chunk in chunks:
+                    token = chunk.get("response") or ""
+                    if not token:
+                        continue
+                    parts.append(token)
+                    yield "token", token
+                    if not restarted and monitor.feed(token):
+                        drifted = True
+                        break
+            finally:
+                await chunks.aclose()
+
+            if not drifted:
+                break
+            restarted = True
+            language_stats["early_restarts"] += 1
+            yield "reset", ""
+            stream = await open_consultation_stream(
+                with_system_prompt(prepared["payload"], language, reinforced=True)
+            )
+    finally:
+        await stream.close()
+
+    # Still wrong after the restart: fall back to a full rewrite.
+    ai_response = await enforce_response_language(
+        expected_language=language,
+        user_text=prepared["symptoms_text"] or "(image-only)",
+        response_text="".join(parts).strip(),
+    )
+    yield "final", ai_response
+
+
+async def lookup_cached_answer(prepared: dict, cache_key: str, user_id: int) -> Optional[str]:
+    """Exact response cache first, then near-duplicate images from the same user."""
+    cached = await response_cache.aget(cache_key)
+    if cached is None and prepared["image_hash"] is not None:
+        scope = make_scope(user_id, prepared["language"], prepared["symptoms_text"], prepared["use_history"])
+        cached = image_cache.get(scope, prepared["image_hash"])
+    return cached
+
+
+async def remember_answer(prepared: dict, cache_key: str, user_id: int, ai_response: str) -> None:
+    await response_cache.aset(cache_key, ai_response)
+    if prepared["image_hash"] is not None:
+        scope = make_scope(user_id, prepared["language"], prepared["symptoms_text"], prepared["use_history"])
+        image_cache.set(scope, prepared["image_hash"], ai_response)
+
+
+@app.post("/api/consultation")
+async def create_consultation(
+    symptoms: Optional[str] = Form(None),
+    image: Optional[UploadFile] = File(None),
+    use_history: bool = Form(True),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Main consultation endpoint - works with or without image"""
+    prepared = await prepare_consultation(
+        symptoms=symptoms,
+        image=image,
+        use_history=use_history,
+        current_user=current_user,
+        db=db,
+    )
+
+    cache_key = make_key(prepared["payload"])
+    cached_response = await lookup_cached_answer(prepared, cache_key, current_user.id)
+    if cached_response is not None:
+        return await finalize_consultation(prepared, cached_response, user_id=current_user.id, db=db)
+
+    # Call Ollama
+    stream = await open_consultation_stream(prepared["payload"])
+    ai_response = ""
+    async for kind, text in stream_consultation_answer(prepared, stream):
+        if kind == "final":
+            ai_response = text
+    await remember_answer(prepared, cache_key, current_user.id, ai_response)
+
+    return await finalize_consultation(prepared, ai_response, user_id=current_user.id, db=db)
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/consultation/stream")
+async def create_consultation_stream(
+    symptoms: Optional[str] = Form(None),
+    image: Optional[UploadFile] = File(None),
+    use_history: bool = Form(True),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Streaming consultation endpoint (Server-Sent Events).
+
+    Emits ``token`` events with model text as it is generated, a ``replace``
+    event whenever the text shown so far must be replaced (an early restart
+    clears it, a language rewrite replaces it), then a ``result`` event with
+    the same body as /api/consultation.
+    Failures once the response has started, including an unreachable model
+    server, are reported as an ``error`` event.
+    """
+    prepared = await prepare_consultation(
+        symptoms=symptoms,
+        image=image,
+        use_history=use_history,
+        current_user=current_user,
+        db=db,
+    )
+    user_id = current_user.id
+
+    cache_key = make_key(prepared["payload"])
+    cached_response = await lookup_cached_answer(prepared, cache_key, user_id)
+    if cached_response is not None:
+        result = await finalize_consultation(prepared, cached_response, user_id=user_id, db=db)
+
+        async def cached_stream():
+            yield sse_event("token", {"text": cached_response})
+            yield sse_event("result", result)
+
+        return StreamingResponse(
+            cached_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    async def event_stream():
+        # Opened inside the body so a client that disconnects before streaming
+        # starts never leaves an upstream stream (and its LLM slot) behind.
+        try:
+            stream = await open_consultation_stream(prepared["payload"])
+        except HTTPException as exc:
+            yield sse_event("error", {"detail": exc.detail})
+            return
+        except SchedulerOverloaded as exc:
+            yield sse_event("error", {"detail": LLM_BUSY_DETAIL, "retry_after": exc.retry_after})
+            return
+
+        shown = ""
+        try:
+            async for kind, text in stream_consultation_answer(prepared, stream):
+                if kind == "token":
+                    shown += text
+                    yield sse_event("token", {"text": text})
+                elif kind == "reset":
+                    shown = ""
+                    yield sse_event("replace", {"text": ""})
+                else:
+                    ai_response = text
+            if ai_response != shown.strip():
+                yield sse_event("replace", {"text": ai_response})
+            await remember_answer(prepared, cache_key, user_id, ai_response)
+
+            # The request-scoped session may already be closed once streaming starts.
+            async with AsyncSessionLocal() as stream_db:
+                result = await finalize_consultation(prepared, ai_response, user_id=user_id, db=stream_db)
+            yield sse_event("result", result)
+        except Exception as exc:
+            print(f"Streaming consultation failed: {exc}")
+            yield sse_event("error", {"detail": "Consultation failed. Please try again."})
+        finally:
+            await stream.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def validate_sync_item(item) -> tuple[Optional[dict], Optional[str]]:
+    """Turn one raw sync item into an insert row, or return an error message."""
+    try:
+        data = SyncConsultation.model_validate(item)
+        priority = PriorityLevel[data.priority.upper()]
+        created_at = datetime.fromisoformat(data.created_at)
+    except ValidationError as e:
+        return None, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+    except KeyError:
+        return None, f"Unknown priority: {item.get('priority')}"
+    except ValueError:
+        return None, f"Invalid created_at: {item.get('created_at')}"
+    if data.client_id is not None and not 0 < len(data.client_id) <= 64:
+        return None, "client_id must be 1-64 characters"
+
+    return {
+        "client_id": data.client_id,
+        "symptoms": data.symptoms,
+        "ai_response": data.ai_response,
+        "priority": priority,
+        "first_aid_suggestions": data.first_aid_suggestions,
+        "recommended_specialization": data.recommended_specialization,
+        "use_history": data.use_history,
+        "is_synced": True,
+        "created_offline": True,
+        "created_at": created_at,
+    }, None
+
+
+def existing_client_ids(db: Session, user_id: int, client_ids: list[str]) -> dict[str, int]:
+    if not client_ids:
+        return {}
+    rows = db.execute(
+        select(Consultation.client_id, Consultation.id).where(
+            Consultation.user_id == user_id,
+            Consultation.client_id.in_(client_ids)
+        )
+    ).all()
+    return dict(rows)
+
+
+def sync_chunk(db: Session, user_id: int, chunk: list[tuple[int, dict]], results: list) -> None:
+    """Insert one chunk of validated rows with a single executemany, skipping known client ids."""
+    client_ids = [row["client_id"] for _, row in chunk if row["client_id"]]
+    for attempt in range(2):
+        known = existing_client_ids(db, user_id, client_ids)
+        seen = set(known)
+        to_insert = []
+        for index, row in chunk:
+            client_id = row["client_id"]
+            if client_id and client_id in seen:
+                continue
+            if client_id:
+                seen.add(client_id)
+            to_insert.append((index, {**row, "user_id": user_id}))
+        try:
+            if to_insert:
+                db.execute(insert(Consultation), [row for _, row in to_insert])
+            db.commit()
+            break
+        except IntegrityError:
+            # A concurrent retry of the same batch won the race; re-check and skip its rows
+            db.rollback()
+            if attempt:
+                raise
+
+    inserted = {index for index, _ in to_insert}
+    ids = existing_client_ids(db, user_id, client_ids)
+    for index, row in chunk:
+        client_id = row["client_id"]
+        results[index] = {
+            "index": index,
+            "client_id": client_id,
+            "status": "created" if index in inserted else "duplicate",
+            "id": ids.get(client_id)
+        }
+
+
 @app.post("/api/sync/consultations")
 def sync_consultations(
-    consultations: list[SyncConsultation],
+    consultations: list[dict],
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Sync offline consultations to database"""
-    synced_count = 0
-    for consult_data in consultations:
-        consultation = Consultation(
-            user_id=current_user.id,
-            symptoms=consult_data.symptoms,
-            ai_response=consult_data.ai_response,
-            priority=PriorityLevel[consult_data.priority.upper()],
-            first_aid_suggestions=consult_data.first_aid_suggestions,
-            recommended_specialization=consult_data.recommended_specialization,
-            use_history=consult_data.use_history,
-            is_synced=True,
-            created_offline=True,
-            created_at=datetime.fromisoformat(consult_data.created_at)
+    """Sync offline consultations to database
+
+    Items are validated one by one and inserted in chunks; resending an item
+    with the same client_id is a no-op. Returns a result per item (by index)
+    so the client knows exactly what to mark as synced.
+    """
+    if len(consultations) > SYNC_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {SYNC_MAX_ITEMS} consultations per sync request"
         )
-        db.add(consultation)
-        synced_count += 1
-    
-    db.commit()
-    return {"synced": synced_count}
+
+    results = [None] * len(consultations)
+    chunk = []
+    for index, item in enumerate(consultations):
+        row, error = validate_sync_item(item)
+        if error:
+            results[index] = {"index": index, "client_id": item.get("client_id"), "status": "invalid", "error": error}
+            continue
+        chunk.append((index, row))
+        if len(chunk) >= SYNC_CHUNK_SIZE:
+            sync_chunk(db, current_user.id, chunk, results)
+            chunk = []
+    if chunk:
+        sync_chunk(db, current_user.id, chunk, results)
+
+    synced_count = sum(1 for r in results if r["status"] == "created")
+    if synced_count:
+        invalidate_admin_stats()
+    return {
+        "synced": synced_count,
+        "duplicates": sum(1 for r in results if r["status"] == "duplicate"),
+        "invalid": sum(1 for r in results if r["status"] == "invalid"),
+        "results": results
+    }
 
 
 @app.get("/api/doctors")
 def get_doctors(
     specialization: Optional[str] = None,
-    db: Session = Depends(get_db)
+    day: Optional[str] = None,
+    ranked: bool = False,
 ):
-    query = db.query(Doctor)
-    if specialization:
-        query = query.filter(Doctor.specialization == specialization)
-    doctors = query.all()
-    return {"doctors": doctors}
+    """List doctors from the in-memory directory.
+
+    ``day`` (Mon..Sun) keeps doctors available that day; ``ranked`` orders by
+    availability on ``day`` (default today), then fee.
+    """
+    if day is not None and day not in WEEKDAYS:
+        raise HTTPException(status_code=400, detail=f"day must be one of: {', '.join(WEEKDAYS)}")
+    snap = doctor_directory.snapshot()
+    return {"doctors": doctor_directory.search(snap, specialization, day, ranked)}
 
 
 @app.get("/api/hospitals")
@@ -705,14 +997,86 @@ def get_ngos(db: Session = Depends(get_db)):
     return {"ngos": ngos}
 
 
+@app.get("/api/nearby")
+def get_nearby_providers(
+    lat: float,
+    lng: float,
+    k: int = 10,
+    kind: Optional[str] = None,
+    emergency: bool = False,
+    specialization: Optional[str] = None,
+    max_km: Optional[float] = None,
+):
+    """Nearest doctors, hospitals and NGOs to a point, closest first.
+
+    ``kind`` (doctor, hospital or ngo) limits the result to one type;
+    ``emergency=true`` keeps only hospitals with emergency care and
+    ``specialization`` only doctors of that specialization.
+    """
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise HTTPException(status_code=400, detail="lat must be within ±90 and lng within ±180")
+    if kind is not None and kind not in PROVIDER_MODELS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(PROVIDER_MODELS)}")
+    k = max(1, min(k, 50))
+
+    grid = provider_index.grid()
+    accept = provider_filter({kind} if kind else None, emergency, specialization)
+    nearest = grid.nearest(lat, lng, k, accept, max_km)
+    return {
+        "results": [
+            {"kind": p.kind, "distance_km": round(distance, 2), **p.fields}
+            for distance, p in nearest
+        ]
+    }
+
+
+def filter_consultations(
+    query,
+    priority: Optional[PriorityLevel] = None,
+    status: Optional[ConsultationStatus] = None,
+    specialization: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    """Apply the optional listing filters shared by patient and admin views."""
+    if priority is not None:
+        query = query.filter(Consultation.priority == priority)
+    if status is not None:
+        query = query.filter(Consultation.status == status)
+    if specialization:
+        query = query.filter(Consultation.recommended_specialization == specialization)
+    if date_from is not None:
+        query = query.filter(Consultation.created_at >= date_from)
+    if date_to is not None:
+        query = query.filter(Consultation.created_at < date_to)
+    return query
+
+
+def page_consultations(query, cursor: Optional[str], limit: int):
+    try:
+        return keyset_page(query, Consultation.created_at, Consultation.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/api/consultations/history")
 def get_consultation_history(
-    current_user: User = Depends(get_current_user),
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    priority: Optional[PriorityLevel] = None,
+    status: Optional[ConsultationStatus] = None,
+    specialization: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: UserIdentity = Depends(get_current_identity),
     db: Session = Depends(get_db)
 ):
-    consultations = db.query(Consultation).filter(
-        Consultation.user_id == current_user.id
-    ).order_by(Consultation.created_at.desc()).limit(20).all()
+    """Patient's consultations, newest first; pass next_cursor back as cursor for older ones"""
+    query = filter_consultations(
+        db.query(Consultation).filter(Consultation.user_id == current_user.id),
+        priority, status, specialization, date_from, date_to
+    )
+    consultations, next_cursor = page_consultations(query, cursor, max(1, min(limit, 100)))
     
     return {
         "consultations": [
@@ -726,8 +1090,33 @@ def get_consultation_history(
                 "created_at": c.created_at.isoformat()
             }
             for c in consultations
-        ]
+        ],
+        "next_cursor": next_cursor
+    }
+
+
+def delete_orphaned_uploads(db: Session, image_paths: list) -> None:
+    """Remove stored images that no remaining consultation references."""
+    image_paths = {path for path in image_paths if path}
+    if not image_paths:
+        return
+    still_used = {
+        path for (path,) in db.query(Consultation.image_path).filter(
+            Consultation.image_path.in_(image_paths)
+        ).distinct()
     }
+    for path in image_paths - still_used:
+        def delete_if_unreferenced(path=path):
+            # Runs under the in-flight lock: a consultation saved since the
+            # query above has released its mark, so look again in a fresh transaction
+            db.commit()
+            if db.query(Consultation.id).filter(Consultation.image_path == path).first() is None:
+                upload_storage.delete(path)
+
+        try:
+            uploads_in_flight.delete_if_idle(path, delete_if_unreferenced)
+        except Exception as e:
+            print(f"Could not delete upload {path}: {e}")
 
 
 @app.delete("/api/consultations/{consultation_id}")
@@ -745,8 +1134,11 @@ def delete_consultation(
     if not consultation:
         raise HTTPException(status_code=404, detail="Consultation not found")
     
+    image_paths = [consultation.image_path]
     db.delete(consultation)
     db.commit()
+    invalidate_admin_stats()
+    delete_orphaned_uploads(db, image_paths)
     return {"message": "Consultation deleted successfully"}
 
 
@@ -757,12 +1149,16 @@ def delete_multiple_consultations(
     db: Session = Depends(get_db)
 ):
     """Delete multiple consultations at once"""
-    deleted_count = db.query(Consultation).filter(
+    owned = db.query(Consultation).filter(
         Consultation.id.in_(consultation_ids),
         Consultation.user_id == current_user.id
-    ).delete(synchronize_session=False)
+    )
+    image_paths = [path for (path,) in owned.with_entities(Consultation.image_path)]
+    deleted_count = owned.delete(synchronize_session=False)
     
     db.commit()
+    invalidate_admin_stats()
+    delete_orphaned_uploads(db, image_paths)
     return {"message": f"Deleted {deleted_count} consultations"}
 
 
@@ -802,6 +1198,7 @@ def take_case(
     consultation.status = ConsultationStatus.UNDER_SUPERVISION
     consultation.supervising_admin_id = current_admin.id
     db.commit()
+    invalidate_admin_stats()
     
     return {
         "message": "Case taken successfully",
@@ -836,6 +1233,7 @@ def mark_case_solved(
     if notes:
         consultation.supervision_notes = notes
     db.commit()
+    invalidate_admin_stats()
     
     return {
         "message": "Case marked as solved",
@@ -867,6 +1265,7 @@ def release_case(
     consultation.status = ConsultationStatus.PENDING
     consultation.supervising_admin_id = None
     db.commit()
+    invalidate_admin_stats()
     
     return {
         "message": "Case released successfully",
@@ -877,14 +1276,47 @@ def release_case(
 # Admin Data Access Endpoints
 
 
+PATIENT_SORT_FIELDS = ("created_at", "name", "consultations")
+
+
 @app.get("/api/admin/patients")
 def get_all_patients(
+    limit: int = 100,
+    offset: int = 0,
+    sort: str = "created_at",
+    order: str = "desc",
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    """Admin: Get all registered patients"""
-    patients = db.query(User).filter(User.is_admin == False).all()
+    """Admin: Get registered patients with consultation counts (paginated)"""
+    if sort not in PATIENT_SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(PATIENT_SORT_FIELDS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    limit = max(1, min(limit, 500))
+    offset = max(0, offset)
+
+    # One grouped query counts consultations instead of loading them per patient
+    total_consultations = func.count(Consultation.id).label("total_consultations")
+    sort_column = {
+        "created_at": User.created_at,
+        "name": func.coalesce(User.full_name, User.username),
+        "consultations": total_consultations,
+    }[sort]
+    direction = sort_column.desc() if order == "desc" else sort_column.asc()
+    tiebreak = User.id.desc() if order == "desc" else User.id.asc()
+
+    rows = db.query(User, total_consultations).outerjoin(
+        Consultation, Consultation.user_id == User.id
+    ).filter(User.is_admin == False).group_by(User.id).order_by(
+        direction, tiebreak
+    ).offset(offset).limit(limit).all()
+    total = db.query(func.count(User.id)).filter(User.is_admin == False).scalar()
+
     return {
+        "total": total,
+        "limit": limit,
+        "offset": offset,
         "patients": [
             {
                 "id": p.id,
@@ -894,9 +1326,9 @@ def get_all_patients(
                 "phone": p.phone,
                 "blood_group": p.blood_group,
                 "created_at": p.created_at.isoformat(),
-                "total_consultations": len(p.consultations)
+                "total_consultations": count
             }
-            for p in patients
+            for p, count in rows
         ]
     }
 
@@ -904,13 +1336,28 @@ def get_all_patients(
 @app.get("/api/admin/consultations")
 def get_all_consultations(
     limit: int = 50,
+    cursor: Optional[str] = None,
+    priority: Optional[PriorityLevel] = None,
+    status: Optional[ConsultationStatus] = None,
+    specialization: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    supervising_admin_id: Optional[int] = None,
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    """Admin: Get all consultations with patient info"""
-    consultations = db.query(Consultation).order_by(
-        Consultation.created_at.desc()
-    ).limit(limit).all()
+    """Admin: Get consultations with patient info, newest first (cursor-paginated)"""
+    # Patient and supervising admin are joined into the same query (no per-row lookups)
+    query = filter_consultations(
+        db.query(Consultation).options(
+            joinedload(Consultation.user),
+            joinedload(Consultation.supervising_admin)
+        ),
+        priority, status, specialization, date_from, date_to
+    )
+    if supervising_admin_id is not None:
+        query = query.filter(Consultation.supervising_admin_id == supervising_admin_id)
+    consultations, next_cursor = page_consultations(query, cursor, max(1, min(limit, 200)))
     
     return {
         "consultations": [
@@ -924,14 +1371,15 @@ def get_all_consultations(
                 "ai_response": c.ai_response,
                 "priority": c.priority.value,
                 "status": c.status.value,
-                "supervising_admin": db.query(User).get(c.supervising_admin_id).username if c.supervising_admin_id else None,
+                "supervising_admin": c.supervising_admin.username if c.supervising_admin else None,
                 "supervision_notes": c.supervision_notes,
                 "recommended_specialization": c.recommended_specialization,
                 "created_at": c.created_at.isoformat(),
                 "is_synced": c.is_synced
             }
             for c in consultations
-        ]
+        ],
+        "next_cursor": next_cursor
     }
 
 
@@ -987,38 +1435,82 @@ def get_patient_detail(
     }
 
 
+@app.get("/api/admin/llm/metrics")
+def get_llm_metrics(current_admin: User = Depends(get_current_admin)):
+    """Admin: LLM scheduler queue and wait-time metrics"""
+    return {
+        "scheduler": scheduler.metrics(),
+        "backends": llm_client.pool.stats(),
+        "pending_summaries": summary_worker.pending_count(),
+        "response_cache": response_cache.stats(),
+        "image_cache": image_cache.stats(),
+        "language_enforcement": language_stats,
+    }
+
+
+@app.get("/api/admin/db/pool")
+def get_db_pool_stats(current_admin: User = Depends(get_current_admin)):
+    """Admin: database connection pool usage and the caches that spare it"""
+    return {
+        **pool_stats(),
+        "user_cache": user_cache.stats(),
+        "doctor_directory": doctor_directory.stats(),
+        "provider_index": provider_index.stats(),
+    }
+
+
+def invalidate_admin_stats():
+    """Drop cached dashboard stats after consultations or patients change."""
+    admin_stats_cache.clear()
+
+
+def compute_admin_stats(db: Session, since: Optional[datetime] = None) -> dict:
+    """Dashboard counts in a single aggregate query over consultations."""
+    def count_where(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    total_patients = db.query(func.count(User.id)).filter(User.is_admin == False).scalar_subquery()
+    query = db.query(
+        total_patients,
+        func.count(Consultation.id),
+        count_where(Consultation.priority == PriorityLevel.CRITICAL),
+        count_where(Consultation.priority == PriorityLevel.HIGH),
+        count_where(Consultation.status == ConsultationStatus.PENDING),
+        count_where(Consultation.status == ConsultationStatus.UNDER_SUPERVISION),
+        count_where(Consultation.status == ConsultationStatus.SOLVED),
+    ).select_from(Consultation)
+    if since is not None:
+        query = query.filter(Consultation.created_at >= since)
+    row = query.one()
+
+    keys = (
+        "total_patients", "total_consultations", "critical_cases", "high_priority_cases",
+        "pending_cases", "under_supervision", "solved_cases",
+    )
+    return {key: int(value or 0) for key, value in zip(keys, row)}
+
+
 @app.get("/api/admin/stats")
 def get_admin_stats(
+    window: Optional[str] = None,
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    """Admin: Get dashboard statistics"""
-    total_patients = db.query(User).filter(User.is_admin == False).count()
-    total_consultations = db.query(Consultation).count()
-    critical_cases = db.query(Consultation).filter(
-        Consultation.priority == PriorityLevel.CRITICAL
-    ).count()
-    high_cases = db.query(Consultation).filter(
-        Consultation.priority == PriorityLevel.HIGH
-    ).count()
-    
-    # Case status counts
-    pending_cases = db.query(Consultation).filter(
-        Consultation.status == ConsultationStatus.PENDING
-    ).count()
-    under_supervision = db.query(Consultation).filter(
-        Consultation.status == ConsultationStatus.UNDER_SUPERVISION
-    ).count()
-    solved_cases = db.query(Consultation).filter(
-        Consultation.status == ConsultationStatus.SOLVED
-    ).count()
-    
-    return {
-        "total_patients": total_patients,
-        "total_consultations": total_consultations,
-        "critical_cases": critical_cases,
-        "high_priority_cases": high_cases,
-        "pending_cases": pending_cases,
-        "under_supervision": under_supervision,
-        "solved_cases": solved_cases
-    }
+    """Admin: Get dashboard statistics
+
+    ``window`` (24h, 7d or 30d) limits consultation counts to recent cases;
+    total_patients is always the overall count.
+    """
+    if window is not None and window not in STATS_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of: {', '.join(STATS_WINDOWS)}")
+
+    cached = admin_stats_cache.get(window)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    since = datetime.utcnow() - STATS_WINDOWS[window] if window else None
+    stats = compute_admin_stats(db, since)
+    if window:
+        stats["window"] = window
+    admin_stats_cache[window] = (time.monotonic() + ADMIN_STATS_TTL, stats)
+    return stats
@@ -1,29 +1,46 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import NamedTuple, Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event
 import os
+import threading
+import time
 
-from database import get_db
+from database import SessionLocal
 from models import User
+from password_hashing import hash_password_sync, verify_password_sync
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Authenticated requests reuse a recently loaded user instead of querying users each time
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))  # seconds
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "1024"))
+# Let read-only endpoints take username/role from the signed token without any lookup.
+# Off by default: a role change then only takes effect when the token expires.
+TRUST_TOKEN_CLAIMS = os.getenv("TRUST_TOKEN_CLAIMS", "false").lower() == "true"
+
+_CACHED_USER_FIELDS = tuple(c.key for c in User.__table__.columns if c.key != "hashed_password")
+
 security = HTTPBearer()
 
 
+# Blocking helpers for scripts; request handlers await password_hashing instead
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_password_sync(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return hash_password_sync(password)
+
+
+def token_claims(user: User) -> dict:
+    """JWT claims for a user: the id plus identity and role for trusted read-only checks."""
+    return {"sub": user.id, "username": user.username, "adm": bool(user.is_admin)}
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -51,12 +68,84 @@ def decode_token(token: str) -> dict:
         )
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    token = credentials.credentials
-    payload = decode_token(token)
+class UserCache:
+    """TTL + LRU cache of user rows (minus the password hash), keyed by user id."""
+
+    def __init__(self, ttl: float = USER_CACHE_TTL, max_entries: int = USER_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # user_id -> (expires_at, fields)
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, user_id: int, fields: dict) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, fields)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "ttl": self.ttl}
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+
+
+class UserIdentity(NamedTuple):
+    id: int
+    username: str
+    is_admin: bool
+
+
+def load_user(user_id: int) -> Optional[User]:
+    """Return a detached User snapshot, from the cache or a short-lived session.
+
+    The snapshot carries column values only; relationships are not loaded.
+    The session is closed right away so no pooled connection is held for the
+    rest of the request (which matters for long streaming responses).
+    """
+    fields = user_cache.get(user_id)
+    if fields is None:
+        with SessionLocal() as db:
+            user = db.get(User, user_id)
+            if user is None:
+                return None
+            fields = {key: getattr(user, key) for key in _CACHED_USER_FIELDS}
+        user_cache.set(user_id, fields)
+    return User(**fields)
+
+
+def _token_payload(credentials: HTTPAuthorizationCredentials) -> tuple[int, dict]:
+    payload = decode_token(credentials.credentials)
     user_id_raw = payload.get("sub")
     if user_id_raw is None:
         raise HTTPException(
@@ -65,17 +154,43 @@ def get_current_user(
         )
 
     try:
-        user_id = int(user_id_raw)
+        return int(user_id_raw), payload
     except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
+    user_id, _ = _token_payload(credentials)
+    user = load_user(user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
     return user
+
+
+def get_current_identity(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> UserIdentity:
+    """Id, username and role for read-only endpoints.
+
+    With TRUST_TOKEN_CLAIMS enabled these come straight from the signed token;
+    otherwise (or for tokens issued without the claims) from ``load_user``.
+    """
+    user_id, payload = _token_payload(credentials)
+    if TRUST_TOKEN_CLAIMS and "username" in payload and "adm" in payload:
+        return UserIdentity(user_id, payload["username"], bool(payload["adm"]))
+
+    user = load_user(user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+    return UserIdentity(user.id, user.username, bool(user.is_admin))
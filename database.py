@@ -1,19 +1,105 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc, inspect
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 import os
+import time
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# DB_PROFILE=sqlite switches the default database to a local SQLite file (handy for testing)
+DB_PROFILE = os.getenv("DB_PROFILE", "mysql")
+DEFAULT_DATABASE_URLS = {
+    "mysql": "mysql+pymysql://root:S@mim101@localhost:3306/wecare_db",
+    "sqlite": "sqlite:///./wecare.db",
+}
+
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
-    "mysql+pymysql://root:S@mim101@localhost:3306/wecare_db"
+    DEFAULT_DATABASE_URLS.get(DB_PROFILE, DEFAULT_DATABASE_URLS["mysql"])
 )
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# Connection pool tuning (ignored for SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; below MySQL wait_timeout
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Ping a pooled connection on checkout only if it sat idle longer than this many
+# seconds. 0 pings on every checkout; a negative value disables pinging.
+DB_PRE_PING_INTERVAL = float(os.getenv("DB_PRE_PING_INTERVAL", "60"))
+
+
+def to_async_url(url: str) -> str:
+    """Swap a sync driver in a database URL for its asyncio counterpart."""
+    scheme, sep, rest = url.partition("://")
+    async_drivers = {
+        "mysql": "mysql+aiomysql",
+        "mysql+pymysql": "mysql+aiomysql",
+        "sqlite": "sqlite+aiosqlite",
+        "sqlite+pysqlite": "sqlite+aiosqlite",
+    }
+    return async_drivers.get(scheme, scheme) + sep + rest
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def engine_options(url: str, *, is_async: bool = False) -> dict:
+    """Engine keyword arguments for the configured profile."""
+    if is_sqlite(url):
+        # SQLite uses SQLAlchemy's default pool; sessions may move between threads.
+        return {} if is_async else {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": DB_PRE_PING_INTERVAL == 0,
+    }
+
+
+def install_idle_pre_ping(sync_engine, interval: float) -> None:
+    """Ping connections on checkout only after they have been idle for ``interval`` seconds."""
+    if interval <= 0 or is_sqlite(str(sync_engine.url)):
+        return
+
+    @event.listens_for(sync_engine, "checkin")
+    def _record_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < interval:
+            return
+        try:
+            alive = sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+        if not alive:
+            # Tells the pool to discard this connection and retry with a fresh one.
+            raise exc.DisconnectionError("Stale pooled connection")
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+install_idle_pre_ping(engine, DB_PRE_PING_INTERVAL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers that must not block the event loop
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+install_idle_pre_ping(async_engine.sync_engine, DB_PRE_PING_INTERVAL)
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 def get_db():
     db = SessionLocal()
@@ -23,6 +109,48 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     from models import Base
+    from migrations.runner import pending_migrations, stamp_all
+
+    fresh = not inspect(engine).has_table("consultations")
     Base.metadata.create_all(bind=engine)
+    if fresh:
+        # create_all just built the current schema, so every migration is already in it
+        stamp_all(engine)
+        return
+
+    pending = pending_migrations(engine)
+    if pending:
+        names = ", ".join(f"{m.version:04d}_{m.name}" for m in pending)
+        print(f"⚠️  Pending schema migrations: {names}. Run: python migrate.py")
+
+
+async def close_async_db():
+    await async_engine.dispose()
+
+
+def _pool_stats(pool) -> dict:
+    stats = {"pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            stats[name] = method()
+    if hasattr(pool, "timeout"):
+        stats["timeout"] = pool.timeout()
+    return stats
+
+
+def pool_stats() -> dict:
+    """Connection pool usage for the sync and async engines."""
+    return {
+        "profile": "sqlite" if is_sqlite(DATABASE_URL) else "mysql",
+        "pre_ping_interval": DB_PRE_PING_INTERVAL,
+        "sync": _pool_stats(engine.pool),
+        "async": _pool_stats(async_engine.pool),
+    }
@@ -0,0 +1,170 @@
+"""
+In-memory doctor directory.
+
+The doctors table is small and changes rarely (``seed_data.py`` or the odd
+admin edit), yet every consultation looked up recommendations and every
+``/api/doctors`` call scanned the table. Here all doctors are loaded once into
+plain dicts indexed by specialization and by weekday, and the snapshot is
+rebuilt when it is older than DOCTOR_DIRECTORY_TTL or when this process writes
+to the doctors table (ORM events bump the version). Changes made by other
+processes, such as a re-seed, show up within the TTL.
+
+Recommendations are ranked: doctors available today first, then by fee
+(unknown fees last), then by id.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal
+from models import Doctor
+
+DOCTOR_DIRECTORY_TTL = float(os.getenv("DOCTOR_DIRECTORY_TTL", "300"))  # seconds
+DEFAULT_SPECIALIZATION = "General Medicine"
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+_DOCTOR_FIELDS = tuple(c.key for c in Doctor.__table__.columns)
+
+
+def parse_days(available_days: Optional[str]) -> frozenset:
+    """'Mon, Wed, Fri' (or 'monday/wednesday') -> {'Mon', 'Wed', 'Fri'}."""
+    days = set()
+    for part in (available_days or "").replace("/", ",").split(","):
+        day = part.strip()[:3].title()
+        if day in WEEKDAYS:
+            days.add(day)
+    return frozenset(days)
+
+
+def today() -> str:
+    return WEEKDAYS[datetime.now().weekday()]
+
+
+class Snapshot(NamedTuple):
+    doctors: tuple  # every doctor as a dict, in id order
+    by_specialization: dict  # specialization -> tuple of doctors (id order)
+    by_day: dict  # weekday abbreviation -> tuple of doctors (id order)
+    days: dict  # doctor id -> frozenset of weekdays
+    version: int
+    loaded_at: float
+
+
+def rank(doctors, days: dict, day: str) -> list:
+    def key(d):
+        return (day not in days[d["id"]], d["fee"] is None, d["fee"] or 0, d["id"])
+    return sorted(doctors, key=key)
+
+
+class DoctorDirectory:
+    def __init__(self, ttl: float = DOCTOR_DIRECTORY_TTL):
+        self.ttl = ttl
+        self.version = 0
+        self.loads = 0
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        self.version += 1
+
+    def is_stale(self) -> bool:
+        snap = self._snapshot
+        return (
+            snap is None
+            or snap.version != self.version
+            or time.monotonic() - snap.loaded_at >= self.ttl
+        )
+
+    def load(self) -> Snapshot:
+        """Read the doctors table and rebuild the indexes (blocking)."""
+        version = self.version
+        db = SessionLocal()
+        try:
+            rows = db.query(Doctor).order_by(Doctor.id).all()
+            doctors = tuple({field: getattr(row, field) for field in _DOCTOR_FIELDS} for row in rows)
+        finally:
+            db.close()
+
+        by_specialization, by_day, days = {}, {}, {}
+        for d in doctors:
+            days[d["id"]] = parse_days(d["available_days"])
+            by_specialization.setdefault(d["specialization"], []).append(d)
+            for day in days[d["id"]]:
+                by_day.setdefault(day, []).append(d)
+        snap = Snapshot(
+            doctors,
+            {k: tuple(v) for k, v in by_specialization.items()},
+            {k: tuple(v) for k, v in by_day.items()},
+            days,
+            version,
+            time.monotonic(),
+        )
+        with self._lock:
+            self._snapshot = snap
+            self.loads += 1
+        return snap
+
+    def snapshot(self) -> Snapshot:
+        if self.is_stale():
+            return self.load()
+        return self._snapshot
+
+    async def snapshot_async(self) -> Snapshot:
+        """Like snapshot(), but reloads on the threadpool so the event loop never blocks."""
+        if self.is_stale():
+            return await run_in_threadpool(self.load)
+        return self._snapshot
+
+    @staticmethod
+    def recommend(snap: Snapshot, specialization: Optional[str], limit: int = 3, day: Optional[str] = None) -> list:
+        """Best-ranked doctors for a specialization, falling back to General Medicine."""
+        day = day or today()
+        doctors = snap.by_specialization.get(specialization) if specialization else None
+        if not doctors:
+            doctors = snap.by_specialization.get(DEFAULT_SPECIALIZATION, ())
+        return rank(doctors, snap.days, day)[:limit]
+
+    @staticmethod
+    def search(
+        snap: Snapshot,
+        specialization: Optional[str] = None,
+        day: Optional[str] = None,
+        ranked: bool = False,
+    ) -> list:
+        """Doctors filtered by specialization and/or weekday, in id order or ranked for ``day`` (default today)."""
+        if specialization:
+            doctors = snap.by_specialization.get(specialization, ())
+            if day:
+                doctors = [d for d in doctors if day in snap.days[d["id"]]]
+        elif day:
+            doctors = snap.by_day.get(day, ())
+        else:
+            doctors = snap.doctors
+        if ranked:
+            return rank(doctors, snap.days, day or today())
+        return list(doctors)
+
+    def stats(self) -> dict:
+        snap = self._snapshot
+        return {
+            "doctors": len(snap.doctors) if snap else 0,
+            "specializations": len(snap.by_specialization) if snap else 0,
+            "version": self.version,
+            "loads": self.loads,
+            "age_seconds": round(time.monotonic() - snap.loaded_at, 1) if snap else None,
+            "ttl": self.ttl,
+        }
+
+
+doctor_directory = DoctorDirectory()
+
+
+@event.listens_for(Doctor, "after_insert")
+@event.listens_for(Doctor, "after_update")
+@event.listens_for(Doctor, "after_delete")
+def _invalidate_directory(mapper, connection, target):
+    doctor_directory.invalidate()
@@ -0,0 +1,225 @@
+"""
+Nearest-provider search over doctors, hospitals and NGOs.
+
+Providers with coordinates are bucketed into a lat/lng grid of
+GEO_CELL_DEGREES cells kept in memory. A k-nearest query scans rings of cells
+outward from the patient's cell (clipped to the cells that hold data) and
+stops once no unvisited cell can hold anything closer than the k-th result,
+so it touches a handful of cells rather than every provider. A query far from
+sparse data falls back to a plain scan once it has visited more cells than
+there are providers. Distances are haversine great-circle kilometres.
+
+The grid is rebuilt like the doctor directory: after PROVIDER_INDEX_TTL
+seconds, or as soon as this process writes to one of the provider tables.
+"""
+import math
+import os
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event
+
+from database import SessionLocal
+from models import NGO, Doctor, Hospital
+
+PROVIDER_INDEX_TTL = float(os.getenv("PROVIDER_INDEX_TTL", "300"))  # seconds
+GEO_CELL_DEGREES = float(os.getenv("GEO_CELL_DEGREES", "0.25"))  # ~28 km of latitude
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+PROVIDER_MODELS = {"doctor": Doctor, "hospital": Hospital, "ngo": NGO}
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class Provider(NamedTuple):
+    kind: str  # doctor, hospital or ngo
+    lat: float
+    lng: float
+    fields: dict  # the row's columns, as returned by the API
+
+
+class GeoGrid:
+    """Providers bucketed by (floor(lat / cell), floor(lng / cell))."""
+
+    def __init__(self, providers, cell: float = GEO_CELL_DEGREES):
+        self.cell = cell
+        self.size = 0
+        self.cells = {}
+        for p in providers:
+            self.cells.setdefault(self._cell_of(p.lat, p.lng), []).append(p)
+            self.size += 1
+        rows = [i for i, _ in self.cells] or [0]
+        cols = [j for _, j in self.cells] or [0]
+        self.bounds = (min(rows), max(rows), min(cols), max(cols))
+
+    def _cell_of(self, lat: float, lng: float) -> tuple:
+        return math.floor(lat / self.cell), math.floor(lng / self.cell)
+
+    def _ring(self, ci: int, cj: int, r: int):
+        """Cells at Chebyshev distance r from (ci, cj) that lie inside the data's bounds."""
+        min_i, max_i, min_j, max_j = self.bounds
+        for i in range(max(ci - r, min_i), min(ci + r, max_i) + 1):
+            if i in (ci - r, ci + r):
+                yield from ((i, j) for j in range(max(cj - r, min_j), min(cj + r, max_j) + 1))
+            else:
+                if min_j <= cj - r <= max_j:
+                    yield i, cj - r
+                if r and min_j <= cj + r <= max_j:
+                    yield i, cj + r
+
+    def _ring_min_km(self, lat: float, r: int) -> float:
+        """Lower bound on the distance from a point to anything in ring r or beyond.
+
+        The point may sit on its own cell's edge, so ring r is at least r - 1
+        whole cells away. Longitude degrees shrink towards the poles, hence the
+        cosine of the widest latitude the ring reaches.
+        """
+        if r <= 1:
+            return 0.0
+        widest = min(90.0, abs(lat) + (r + 1) * self.cell)
+        return (r - 1) * self.cell * KM_PER_DEGREE * math.cos(math.radians(widest))
+
+    def nearest(self, lat: float, lng: float, k: int, accept=None, max_km: Optional[float] = None) -> list:
+        """Up to ``k`` (distance_km, provider) pairs, closest first, passing ``accept``."""
+        if not self.size or k <= 0:
+            return []
+        ci, cj = self._cell_of(lat, lng)
+        min_i, max_i, min_j, max_j = self.bounds
+        # Rings closer than the data's bounding box are empty; rings past its far edge too
+        first_ring = max(0, min_i - ci, ci - max_i, min_j - cj, cj - max_j)
+        last_ring = max(abs(ci - min_i), abs(ci - max_i), abs(cj - min_j), abs(cj - max_j))
+        budget = self.size  # cells to visit before a linear scan is the cheaper option
+
+        found = []
+        for r in range(first_ring, last_ring + 1):
+            bound = self._ring_min_km(lat, r)
+            if max_km is not None and bound > max_km:
+                break
+            if len(found) >= k and found[k - 1][0] <= bound:
+                break
+            for key in self._ring(ci, cj, r):
+                budget -= 1
+                if budget < 0:
+                    return self._closest(self._all(), lat, lng, k, accept, max_km)
+                found.extend(self._closest(self.cells.get(key, ()), lat, lng, k, accept, max_km))
+            found.sort(key=self._order)
+            del found[k:]
+        return found
+
+    def _all(self):
+        for providers in self.cells.values():
+            yield from providers
+
+    @staticmethod
+    def _order(item) -> tuple:
+        distance, p = item
+        return distance, p.kind, p.fields["id"]
+
+    def _closest(self, providers, lat: float, lng: float, k: int, accept, max_km: Optional[float]) -> list:
+        found = []
+        for p in providers:
+            if accept is not None and not accept(p):
+                continue
+            distance = haversine_km(lat, lng, p.lat, p.lng)
+            if max_km is None or distance <= max_km:
+                found.append((distance, p))
+        found.sort(key=self._order)
+        return found[:k]
+
+
+class ProviderIndex:
+    def __init__(self, ttl: float = PROVIDER_INDEX_TTL):
+        self.ttl = ttl
+        self.version = 0
+        self.loads = 0
+        self._grid: Optional[GeoGrid] = None
+        self._grid_version = -1
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        self.version += 1
+
+    def is_stale(self) -> bool:
+        return (
+            self._grid is None
+            or self._grid_version != self.version
+            or time.monotonic() - self._loaded_at >= self.ttl
+        )
+
+    def load(self) -> GeoGrid:
+        """Read providers with coordinates from the database and rebuild the grid (blocking)."""
+        version = self.version
+        providers = []
+        db = SessionLocal()
+        try:
+            for kind, model in PROVIDER_MODELS.items():
+                columns = [c.key for c in model.__table__.columns]
+                rows = db.query(model).filter(model.lat.isnot(None), model.lng.isnot(None)).order_by(model.id)
+                for row in rows:
+                    providers.append(Provider(kind, row.lat, row.lng, {c: getattr(row, c) for c in columns}))
+        finally:
+            db.close()
+
+        grid = GeoGrid(providers)
+        with self._lock:
+            self._grid, self._grid_version, self._loaded_at = grid, version, time.monotonic()
+            self.loads += 1
+        return grid
+
+    def grid(self) -> GeoGrid:
+        if self.is_stale():
+            return self.load()
+        return self._grid
+
+    def stats(self) -> dict:
+        grid = self._grid
+        return {
+            "providers": grid.size if grid else 0,
+            "cells": len(grid.cells) if grid else 0,
+            "cell_degrees": GEO_CELL_DEGREES,
+            "version": self.version,
+            "loads": self.loads,
+            "ttl": self.ttl,
+        }
+
+
+provider_index = ProviderIndex()
+
+
+def provider_filter(
+    kinds: Optional[set] = None,
+    emergency_only: bool = False,
+    specialization: Optional[str] = None,
+):
+    """Predicate for GeoGrid.nearest; the hospital/doctor filters leave other kinds out."""
+    def accept(p: Provider) -> bool:
+        if kinds and p.kind not in kinds:
+            return False
+        if emergency_only and not (p.kind == "hospital" and p.fields["emergency_available"]):
+            return False
+        if specialization and not (p.kind == "doctor" and p.fields["specialization"] == specialization):
+            return False
+        return True
+    return accept
+
+
+@event.listens_for(Doctor, "after_insert")
+@event.listens_for(Doctor, "after_update")
+@event.listens_for(Doctor, "after_delete")
+@event.listens_for(Hospital, "after_insert")
+@event.listens_for(Hospital, "after_update")
+@event.listens_for(Hospital, "after_delete")
+@event.listens_for(NGO, "after_insert")
+@event.listens_for(NGO, "after_update")
+@event.listens_for(NGO, "after_delete")
+def _invalidate_index(mapper, connection, target):
+    provider_index.invalidate()
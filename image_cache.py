@@ -0,0 +1,103 @@
+"""
+Near-duplicate image cache of model answers.
+
+The exact response cache only matches byte-identical uploads, but a user who
+retries on a flaky connection usually re-sends a re-encoded or re-taken photo
+of the same thing. Here answers are indexed by the 64-bit difference hash
+(dHash) of the processed image, and a lookup matches any stored hash within a
+small Hamming distance. Entries are scoped to the same user, language, text
+and history setting, so an answer is only reused for what is effectively the
+same question.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from response_cache import normalize_prompt
+
+IMAGE_CACHE_TTL = float(os.getenv("IMAGE_CACHE_TTL", "900"))  # seconds; 0 disables
+IMAGE_CACHE_MAX_DISTANCE = int(os.getenv("IMAGE_CACHE_MAX_DISTANCE", "6"))  # differing bits out of 64
+IMAGE_CACHE_MAX_SCOPES = int(os.getenv("IMAGE_CACHE_MAX_SCOPES", "2048"))
+IMAGE_CACHE_ENTRIES_PER_SCOPE = 8
+
+
+def make_scope(user_id: int, language: str, symptoms: str, use_history: bool) -> str:
+    material = f"{user_id}\x00{language}\x00{int(use_history)}\x00{normalize_prompt(symptoms)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class PerceptualCache:
+    """Per-scope lists of (dHash, expires_at, answer), LRU-bounded by scope."""
+
+    def __init__(
+        self,
+        ttl: float = IMAGE_CACHE_TTL,
+        max_distance: int = IMAGE_CACHE_MAX_DISTANCE,
+        max_scopes: int = IMAGE_CACHE_MAX_SCOPES,
+    ):
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.max_scopes = max_scopes
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._scopes = OrderedDict()  # scope -> list of (image_hash, expires_at, answer)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, scope: str, image_hash: int) -> Optional[str]:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entries = [e for e in self._scopes.get(scope, ()) if e[1] > now]
+            best = None
+            for stored_hash, _, answer in entries:
+                distance = (stored_hash ^ image_hash).bit_count()
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, answer)
+            if entries:
+                self._scopes[scope] = entries
+                self._scopes.move_to_end(scope)
+            else:
+                self._scopes.pop(scope, None)
+
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if best[0]:
+                self.near_hits += 1
+            return best[1]
+
+    def set(self, scope: str, image_hash: int, answer: str) -> None:
+        if not self.enabled or not answer:
+            return
+        with self._lock:
+            entries = self._scopes.setdefault(scope, [])
+            entries.append((image_hash, time.monotonic() + self.ttl, answer))
+            del entries[:-IMAGE_CACHE_ENTRIES_PER_SCOPE]
+            self._scopes.move_to_end(scope)
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "scopes": len(self._scopes),
+            "hits": self.hits,
+            "near_duplicate_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "max_distance": self.max_distance,
+        }
+
+
+image_cache = PerceptualCache()
@@ -0,0 +1,113 @@
+"""
+Image ingestion for consultation uploads.
+
+Uploads are read in chunks with a hard size limit, then decoded, EXIF-rotated,
+downscaled to the vision model's input size and re-encoded on a small thread
+pool (Pillow releases the GIL while it works), so the event loop never runs
+image code. JPEG sources use ``Image.draft`` to let the decoder skip straight
+to a reduced scale, which keeps multi-megapixel phone photos cheap in both
+time and memory. The encoded result lives in one buffer that is used for the
+stored file and the base64 model payload alike.
+"""
+import asyncio
+import base64
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+try:
+    from PIL import Image, ImageOps
+except Exception:  # Pillow not installed
+    Image = None
+    ImageOps = None
+
+IMAGE_MAX_UPLOAD_BYTES = int(os.getenv("IMAGE_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(50_000_000)))  # decompression bomb guard
+IMAGE_MODEL_MAX_SIDE = int(os.getenv("IMAGE_MODEL_MAX_SIDE", "1024"))  # vision model input size
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "JPEG").upper()  # JPEG or PNG (lossless, larger)
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "90"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+IMAGE_READ_CHUNK = 64 * 1024
+
+_EXTENSIONS = {"JPEG": "jpg", "PNG": "png"}
+
+_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image")
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+class ProcessedImage(NamedTuple):
+    data: memoryview  # encoded image; shared by the stored file and the model payload
+    extension: str
+    width: int
+    height: int
+    dhash: int  # 64-bit perceptual hash, for near-duplicate lookups
+
+    def base64(self) -> str:
+        return base64.b64encode(self.data).decode("ascii")
+
+
+def available() -> bool:
+    return Image is not None
+
+
+async def read_upload(upload, max_bytes: int = IMAGE_MAX_UPLOAD_BYTES) -> bytearray:
+    """Read an UploadFile chunk by chunk, stopping as soon as it exceeds ``max_bytes``."""
+    if upload.size is not None and upload.size > max_bytes:
+        raise ImageTooLarge(f"Image is larger than {max_bytes // (1024 * 1024)} MB")
+    data = bytearray()
+    while chunk := await upload.read(IMAGE_READ_CHUNK):
+        data += chunk
+        if len(data) > max_bytes:
+            raise ImageTooLarge(f"Image is larger than {max_bytes // (1024 * 1024)} MB")
+    if not data:
+        raise InvalidImage("Uploaded image is empty")
+    return data
+
+
+def difference_hash(im) -> int:
+    """64-bit dHash: brightness gradients of a 9x8 grayscale thumbnail."""
+    pixels = im.convert("L").resize((9, 8), Image.Resampling.BILINEAR).tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            value = (value << 1) | (left > pixels[row * 9 + col + 1])
+    return value
+
+
+def process_sync(raw: bytes, max_side: int = IMAGE_MODEL_MAX_SIDE, image_format: str = IMAGE_FORMAT) -> ProcessedImage:
+    """Decode, orient, downscale and re-encode one image (blocking)."""
+    try:
+        with Image.open(io.BytesIO(raw)) as im:
+            if im.width * im.height > IMAGE_MAX_PIXELS:
+                raise ImageTooLarge("Image resolution is too high")
+            # JPEG only: decode directly at 1/2, 1/4 or 1/8 scale when that still covers max_side
+            im.draft("RGB", (max_side, max_side))
+            im = ImageOps.exif_transpose(im).convert("RGB")
+            im.thumbnail((max_side, max_side))
+
+            out = io.BytesIO()
+            if image_format == "PNG":
+                im.save(out, format="PNG")
+            else:
+                im.save(out, format="JPEG", quality=IMAGE_JPEG_QUALITY, optimize=True)
+            return ProcessedImage(
+                out.getbuffer(), _EXTENSIONS.get(image_format, "jpg"), im.width, im.height, difference_hash(im)
+            )
+    except ImageTooLarge:
+        raise
+    except Exception as exc:
+        raise InvalidImage("Unsupported image format. Please upload a PNG or JPG image.") from exc
+
+
+async def process(raw: bytes) -> ProcessedImage:
+    return await asyncio.get_running_loop().run_in_executor(_executor, process_sync, raw)
+
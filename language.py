@@ -0,0 +1,95 @@
+"""
+Language detection and enforcement for model answers.
+
+The expected language is pinned up front with a system prompt. While an
+answer streams in, ``LanguageDriftMonitor`` checks its script mix after the
+first few dozen letters so a wrong-language answer can be cancelled and
+restarted early instead of rewritten after the fact.
+"""
+import os
+
+from text_stats import count_scripts, script_counts
+
+BENGALI_RATIO_THRESHOLD = 0.2
+LANGUAGE_DRIFT_MIN_LETTERS = int(os.getenv("LANGUAGE_DRIFT_MIN_LETTERS", "60"))
+
+SYSTEM_PROMPTS = {
+    "bn": "আপনি শুধুমাত্র বাংলা ভাষায় উত্তর দেবেন। কোনো ইংরেজি বাক্য বা শব্দ ব্যবহার করবেন না।",
+    "en": "You always answer in English only. Never use Bengali script.",
+}
+
+REINFORCED_SYSTEM_PROMPTS = {
+    "bn": "আপনার আগের উত্তরটি ভুল ভাষায় শুরু হয়েছিল। এবার প্রথম শব্দ থেকেই সম্পূর্ণ উত্তর বাংলায় লিখুন। কোনো ইংরেজি ব্যবহার করবেন না।",
+    "en": "Your previous answer started in the wrong language. This time write the entire answer in English from the first word. Never use Bengali script.",
+}
+
+# How often enforcement had to step in (exposed via /api/admin/llm/metrics)
+language_stats = {
+    "responses": 0,
+    "early_restarts": 0,
+    "rewrites": 0,
+}
+
+
+def detect_language(text: str) -> str:
+    """Detect whether user text is Bengali or English.
+
+    Returns:
+        "bn" for Bengali, "en" otherwise.
+    """
+    s = (text or "").strip()
+    if not s:
+        return "en"
+
+    counts = script_counts(s)
+
+    # If Bengali script is present and is not trivially small, treat as Bengali.
+    if counts.bengali >= 3 and counts.bengali >= counts.latin:
+        return "bn"
+    return "en"
+
+
+def bengali_ratio(text: str) -> float:
+    return script_counts(text or "").bengali_ratio
+
+
+def matches_language(text: str, expected_language: str) -> bool:
+    looks_bengali = bengali_ratio(text) >= BENGALI_RATIO_THRESHOLD
+    return looks_bengali if expected_language == "bn" else not looks_bengali
+
+
+def with_system_prompt(payload: dict, language: str, *, reinforced: bool = False) -> dict:
+    prompts = REINFORCED_SYSTEM_PROMPTS if reinforced else SYSTEM_PROMPTS
+    return {**payload, "system": prompts.get(language, prompts["en"])}
+
+
+class LanguageDriftMonitor:
+    """Incrementally checks whether a streamed answer is in the expected language.
+
+    The decision is made once, as soon as ``min_letters`` letters have arrived;
+    after that the answer is trusted so long answers are never cut late.
+    """
+
+    def __init__(self, expected_language: str, min_letters: int = LANGUAGE_DRIFT_MIN_LETTERS):
+        self.expected_language = expected_language
+        self.min_letters = min_letters
+        self.bengali = 0
+        self.latin = 0
+        self.decided = False
+
+    def feed(self, text: str) -> bool:
+        """Add a chunk; returns True if the answer has drifted into the wrong language."""
+        if self.decided:
+            return False
+        counts = count_scripts(text)
+        self.bengali += counts.bengali
+        self.latin += counts.latin
+        total = self.bengali + self.latin
+        if total < self.min_letters:
+            return False
+
+        self.decided = True
+        looks_bengali = self.bengali / total >= BENGALI_RATIO_THRESHOLD
+        if self.expected_language == "bn":
+            return not looks_bengali
+        return looks_bengali
@@ -0,0 +1,164 @@
+"""
+Pool of Ollama hosts with load balancing and failure ejection.
+
+Set OLLAMA_HOSTS to a comma-separated list of base URLs (optionally
+``url|weight``) to spread inference over several machines; otherwise the
+single OLLAMA_HOST is used. Hosts that refuse connections or answer 5xx are
+ejected for a while and requests are retried on another host. A background
+health check against /api/tags brings ejected hosts back.
+"""
+import asyncio
+import os
+import time
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434").rstrip("/")
+OLLAMA_HOSTS = os.getenv("OLLAMA_HOSTS", "")
+LLM_ROUTING = os.getenv("LLM_ROUTING", "least_outstanding")  # or weighted_round_robin
+LLM_EJECT_SECONDS = float(os.getenv("LLM_EJECT_SECONDS", "30"))
+LLM_MAX_EJECT_SECONDS = float(os.getenv("LLM_MAX_EJECT_SECONDS", "300"))
+LLM_HEALTH_INTERVAL = float(os.getenv("LLM_HEALTH_INTERVAL", "15"))
+
+
+class Backend:
+    """One Ollama host and its routing state."""
+
+    def __init__(self, url: str, weight: int = 1):
+        self.url = url.rstrip("/")
+        self.weight = max(1, weight)
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.current_weight = 0  # smooth weighted round-robin state
+
+    @property
+    def healthy(self) -> bool:
+        return self.ejected_until <= time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "weight": self.weight,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+def parse_hosts(value: str) -> list[Backend]:
+    backends = []
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        url, _, weight = entry.partition("|")
+        backends.append(Backend(url.strip(), int(weight) if weight.strip() else 1))
+    return backends
+
+
+class BackendPool:
+    def __init__(self, backends: list[Backend], strategy: str = LLM_ROUTING):
+        if not backends:
+            raise ValueError("At least one Ollama host is required")
+        self.backends = backends
+        self.strategy = strategy
+        self._health_task: Optional[asyncio.Task] = None
+
+    def label(self) -> str:
+        return ", ".join(b.url for b in self.backends)
+
+    def pick(self, exclude: tuple = ()) -> Optional[Backend]:
+        """Choose a backend for the next request, skipping ``exclude``.
+
+        Falls back to ejected hosts when no healthy one is left, so an outage
+        of every host still surfaces the real connection error.
+        """
+        candidates = [b for b in self.backends if b not in exclude]
+        if not candidates:
+            return None
+        healthy = [b for b in candidates if b.healthy]
+        if not healthy:
+            return min(candidates, key=lambda b: b.ejected_until)
+
+        if self.strategy == "weighted_round_robin":
+            total = sum(b.weight for b in healthy)
+            for b in healthy:
+                b.current_weight += b.weight
+            chosen = max(healthy, key=lambda b: b.current_weight)
+            chosen.current_weight -= total
+            return chosen
+        return min(healthy, key=lambda b: (b.outstanding / b.weight, b.requests))
+
+    def begin(self, backend: Backend) -> None:
+        backend.outstanding += 1
+        backend.requests += 1
+
+    def end(self, backend: Backend) -> None:
+        backend.outstanding -= 1
+
+    def mark_success(self, backend: Backend) -> None:
+        backend.consecutive_failures = 0
+        backend.ejected_until = 0.0
+
+    def mark_failure(self, backend: Backend) -> None:
+        """Passively eject a host, backing off longer on repeated failures."""
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        delay = min(LLM_EJECT_SECONDS * 2 ** (backend.consecutive_failures - 1), LLM_MAX_EJECT_SECONDS)
+        backend.ejected_until = time.monotonic() + delay
+        print(f"Ollama host {backend.url} ejected for {delay:.0f}s")
+
+    async def check_health(self, client: httpx.AsyncClient) -> None:
+        for backend in self.backends:
+            try:
+                res = await client.get(f"{backend.url}/api/tags", timeout=5.0)
+                ok = res.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                if not backend.healthy:
+                    print(f"Ollama host {backend.url} is healthy again")
+                self.mark_success(backend)
+            elif backend.healthy:
+                self.mark_failure(backend)
+
+    def start_health_checks(self, client: httpx.AsyncClient) -> None:
+        if len(self.backends) < 2 or self._health_task is not None:
+            return
+
+        async def loop():
+            while True:
+                await asyncio.sleep(LLM_HEALTH_INTERVAL)
+                try:
+                    await self.check_health(client)
+                except Exception as e:
+                    print(f"Ollama health check failed: {e}")
+
+        self._health_task = asyncio.create_task(loop())
+
+    async def stop_health_checks(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+    def stats(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "backends": [b.stats() for b in self.backends],
+        }
+
+
+def is_retryable_status(status_code: int) -> bool:
+    return status_code >= 500
+
+
+pool = BackendPool(parse_hosts(OLLAMA_HOSTS) or [Backend(OLLAMA_HOST)])
@@ -0,0 +1,195 @@
+"""
+Shared, connection-pooled HTTP client for the Ollama API.
+
+One httpx.AsyncClient lives for the whole application lifetime so LLM calls
+reuse keep-alive connections instead of opening a new socket per request.
+Requests are routed across the hosts in ``llm_backends.pool`` and retried on
+another host when one is unreachable or answers 5xx.
+"""
+import json
+import os
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from llm_backends import Backend, is_retryable_status, pool
+from llm_scheduler import PRIORITY_CONSULTATION, scheduler
+
+load_dotenv()
+
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "qwen3-vl:2b")
+
+# Connection pool limits
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+
+# Timeouts (seconds)
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_POOL_TIMEOUT = float(os.getenv("LLM_POOL_TIMEOUT", "10"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT, pool=LLM_POOL_TIMEOUT)
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+async def open_client() -> httpx.AsyncClient:
+    """Create the shared client (called on application startup)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    pool.start_health_checks(_client)
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client and its pooled connections (called on shutdown)."""
+    global _client
+    await pool.stop_health_checks()
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily if startup has not run."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+def request_timeout(read: float) -> httpx.Timeout:
+    """Per-call timeout that keeps the pool's connect/pool limits."""
+    return httpx.Timeout(read, connect=LLM_CONNECT_TIMEOUT, pool=LLM_POOL_TIMEOUT)
+
+
+# Connection-level failures after which the request is retried on another host
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+
+async def _send(request_kwargs: dict, *, stream: bool) -> tuple[httpx.Response, Backend]:
+    """Send to one backend after another until one answers without a 5xx."""
+    client = get_client()
+    tried = []
+    while True:
+        backend = pool.pick(exclude=tuple(tried))
+        tried.append(backend)
+        # Not pick(): weighted round robin advances its rotation on every call
+        last_attempt = len(tried) >= len(pool.backends)
+        request = client.build_request(
+            "POST", f"{backend.url}/api/generate", **request_kwargs
+        )
+        pool.begin(backend)
+        try:
+            response = await client.send(request, stream=stream)
+        except RETRYABLE_ERRORS:
+            pool.end(backend)
+            pool.mark_failure(backend)
+            if last_attempt:
+                raise
+            continue
+        except BaseException:
+            pool.end(backend)
+            raise
+
+        if not is_retryable_status(response.status_code):
+            pool.mark_success(backend)
+            return response, backend
+        pool.mark_failure(backend)
+        if last_attempt:
+            return response, backend
+        await response.aclose()
+        pool.end(backend)
+
+
+async def generate(
+    payload: dict,
+    *,
+    timeout: Optional[float] = None,
+    priority: int = PRIORITY_CONSULTATION,
+) -> httpx.Response:
+    """POST a payload to Ollama's /api/generate using the pooled client.
+
+    Waits for a scheduler slot first; raises SchedulerOverloaded if the queue is full.
+    """
+    async with scheduler.slot(priority):
+        response, backend = await _send(
+            {"json": payload, "timeout": request_timeout(timeout or LLM_TIMEOUT)},
+            stream=False,
+        )
+        pool.end(backend)
+        return response
+
+
+class LLMStream:
+    """An open streaming /api/generate response holding a scheduler slot until closed."""
+
+    def __init__(self, response: httpx.Response, backend: Backend, granted_at: float):
+        self.response = response
+        self.backend = backend
+        self._granted_at = granted_at
+        self._closed = False
+
+    @property
+    def status_code(self) -> int:
+        return self.response.status_code
+
+    async def read_text(self) -> str:
+        return (await self.response.aread()).decode("utf-8", errors="replace")
+
+    async def chunks(self):
+        """Yield the NDJSON chunks of the response, then close it."""
+        try:
+            async for line in self.response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                yield chunk
+                if chunk.get("done"):
+                    break
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self.response.aclose()
+        finally:
+            pool.end(self.backend)
+            scheduler.release(self._granted_at)
+
+
+async def open_stream(
+    payload: dict,
+    *,
+    timeout: Optional[float] = None,
+    priority: int = PRIORITY_CONSULTATION,
+) -> LLMStream:
+    """Start a streaming /api/generate call.
+
+    The caller must consume ``chunks()`` (which closes the stream) or call
+    ``close()`` itself so the scheduler slot is released.
+    """
+    granted_at = await scheduler.acquire(priority)
+    try:
+        response, backend = await _send(
+            {"json": {**payload, "stream": True}, "timeout": request_timeout(timeout or LLM_TIMEOUT)},
+            stream=True,
+        )
+    except BaseException:
+        scheduler.release(granted_at)
+        raise
+    return LLMStream(response, backend, granted_at)
@@ -0,0 +1,147 @@
+"""
+Admission control for Ollama requests.
+
+A single local model degrades for everyone when it is sent too many requests
+at once. The scheduler caps in-flight LLM calls, queues the rest by priority
+(interactive consultations before background summary/rewrite calls) and
+rejects new work once the queue is full so callers can answer 503 quickly.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "32"))
+LLM_RETRY_AFTER = int(os.getenv("LLM_RETRY_AFTER", "10"))
+
+# Lower value = served first
+PRIORITY_CONSULTATION = 0
+PRIORITY_REWRITE = 1
+PRIORITY_SUMMARY = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_CONSULTATION: "consultation",
+    PRIORITY_REWRITE: "rewrite",
+    PRIORITY_SUMMARY: "summary",
+}
+
+_SAMPLE_SIZE = 500
+
+
+class SchedulerOverloaded(Exception):
+    """Raised when the wait queue is full; ``retry_after`` is a hint in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("LLM queue is full")
+        self.retry_after = retry_after
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LLMScheduler:
+    """Priority-aware concurrency limiter with a bounded wait queue."""
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, max_queue: int = LLM_MAX_QUEUE):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.active = 0
+        self._waiters = []  # heap of (priority, seq, future, enqueued_at)
+        self._seq = itertools.count()
+        self._wait_times = {p: deque(maxlen=_SAMPLE_SIZE) for p in PRIORITY_NAMES}
+        self._service_times = deque(maxlen=_SAMPLE_SIZE)
+        self.admitted = 0
+        self.rejected = 0
+
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, fut, _ in self._waiters if not fut.done())
+
+    def retry_after(self) -> int:
+        """Rough estimate of how long the current queue needs to drain."""
+        if not self._service_times:
+            return LLM_RETRY_AFTER
+        avg_service = sum(self._service_times) / len(self._service_times)
+        batches = (self.queue_depth() + self.active) / self.max_concurrency
+        return max(1, math.ceil(avg_service * batches))
+
+    async def acquire(self, priority: int = PRIORITY_CONSULTATION) -> float:
+        """Wait for a free slot; returns the time the slot was granted."""
+        enqueued_at = time.monotonic()
+        if self.active < self.max_concurrency and not self.queue_depth():
+            self.active += 1
+            return self._granted(priority, enqueued_at)
+
+        if self.queue_depth() >= self.max_queue:
+            self.rejected += 1
+            raise SchedulerOverloaded(self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future, enqueued_at))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over just as we were cancelled; pass it on.
+                self._release_slot()
+            raise
+        return self._granted(priority, enqueued_at)
+
+    def release(self, granted_at: float) -> None:
+        self._service_times.append(time.monotonic() - granted_at)
+        self._release_slot()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_CONSULTATION):
+        granted_at = await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(granted_at)
+
+    def metrics(self) -> dict:
+        waits = {}
+        for priority, samples in self._wait_times.items():
+            values = list(samples)
+            waits[PRIORITY_NAMES[priority]] = {
+                "samples": len(values),
+                "avg_ms": round(sum(values) / len(values) * 1000, 1) if values else 0.0,
+                "p95_ms": round(_percentile(values, 95) * 1000, 1),
+                "max_ms": round(max(values) * 1000, 1) if values else 0.0,
+            }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queue_depth(),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_time": waits,
+        }
+
+    def _granted(self, priority: int, enqueued_at: float) -> float:
+        now = time.monotonic()
+        self.admitted += 1
+        self._wait_times[priority].append(now - enqueued_at)
+        return now
+
+    def _release_slot(self) -> None:
+        # Hand the slot straight to the best waiter, skipping cancelled ones.
+        while self._waiters:
+            _, _, future, _ = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+
+scheduler = LLMScheduler()
@@ -0,0 +1,42 @@
+"""
+Apply pending schema migrations from migrations/
+
+Usage:
+    python migrate.py              # apply everything pending
+    python migrate.py --dry-run    # print the SQL without changing anything
+    python migrate.py --to 2       # stop after version 2
+    python migrate.py status       # list applied and pending versions
+"""
+import argparse
+from database import engine
+from migrations.runner import applied_versions, discover_migrations, run_migrations
+
+def show_status():
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+    for migration in discover_migrations():
+        mark = "✓" if migration.version in done else " "
+        print(f"[{mark}] {migration.version:04d}_{migration.name}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "status"])
+    parser.add_argument("--dry-run", action="store_true", help="print SQL instead of executing it")
+    parser.add_argument("--to", type=int, default=None, help="highest version to apply")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        show_status()
+        return
+
+    print(f"🔄 Running migrations{' (dry run)' if args.dry_run else ''}\n")
+    applied = run_migrations(engine, dry_run=args.dry_run, target=args.to)
+    if not applied:
+        print("✓ Schema is up to date")
+    elif args.dry_run:
+        print(f"\n{len(applied)} migration(s) would be applied")
+    else:
+        print(f"\n✅ Applied {len(applied)} migration(s)")
+
+if __name__ == "__main__":
+    main()
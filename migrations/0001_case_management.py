@@ -0,0 +1,10 @@
+"""Case management columns: status, supervising admin and resolution notes."""
+from sqlalchemy import Enum, Integer, Text
+
+from models import ConsultationStatus
+
+
+def upgrade(ctx):
+    ctx.add_column("consultations", "status", Enum(ConsultationStatus), default="'PENDING'")
+    ctx.add_column("consultations", "supervising_admin_id", Integer(), references="users(id)")
+    ctx.add_column("consultations", "supervision_notes", Text())
@@ -0,0 +1,8 @@
+"""Background summary flag, indexed so the worker can find pending rows on startup."""
+from sqlalchemy import Boolean
+
+
+def upgrade(ctx):
+    ctx.add_column("consultations", "summary_pending", Boolean(), default="0")
+    ctx.backfill("consultations", "summary_pending = 0", "summary_pending IS NULL")
+    ctx.create_index("consultations", "ix_consultations_summary_pending", ["summary_pending"])
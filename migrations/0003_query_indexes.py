@@ -0,0 +1,13 @@
+"""Composite indexes for keyset pagination, the admin case queue and doctor lookup."""
+
+
+def upgrade(ctx):
+    ctx.create_index("consultations", "ix_consultations_created_at_id", ["created_at", "id"])
+    ctx.create_index("consultations", "ix_consultations_user_created_at_id", ["user_id", "created_at", "id"])
+    ctx.create_index(
+        "consultations", "ix_consultations_status_priority_created_at", ["status", "priority", "created_at"]
+    )
+    ctx.create_index(
+        "consultations", "ix_consultations_supervising_admin_created_at", ["supervising_admin_id", "created_at"]
+    )
+    ctx.create_index("doctors", "ix_doctors_specialization", ["specialization"])
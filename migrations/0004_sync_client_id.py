@@ -0,0 +1,7 @@
+"""Client-generated id on consultations so offline sync retries don't insert duplicates."""
+from sqlalchemy import String
+
+
+def upgrade(ctx):
+    ctx.add_column("consultations", "client_id", String(64))
+    ctx.create_index("consultations", "ux_consultations_user_client_id", ["user_id", "client_id"], unique=True)
@@ -0,0 +1,5 @@
+"""Index image_path so deleting a consultation can check whether its upload is still referenced."""
+
+
+def upgrade(ctx):
+    ctx.create_index("consultations", "ix_consultations_image_path", ["image_path"])
@@ -0,0 +1,53 @@
+"""Numeric lat/lng on doctors, hospitals and NGOs, parsed from the string coordinates and indexed for nearby search."""
+import time
+
+from sqlalchemy import Float, text
+
+from migrations.runner import BACKFILL_BATCH_SIZE, BACKFILL_PAUSE
+from models import parse_coordinate
+
+PROVIDER_TABLES = ("doctors", "hospitals", "ngos")
+
+
+def backfill_coordinates(ctx, table: str) -> None:
+    """Parse latitude/longitude exactly as the models do, so junk stays NULL.
+
+    A SQL CAST would turn "abc" into 0.0 (SQLite) or abort the UPDATE (MySQL
+    strict mode), hence reading rows in id batches and converting in Python.
+    """
+    if ctx.dry_run:
+        print(f"    [dry-run] backfill {table}.lat/lng from latitude/longitude in batches of {BACKFILL_BATCH_SIZE}")
+        return
+
+    last_id, updated = 0, 0
+    while True:
+        rows = ctx.conn.execute(
+            text(
+                f"SELECT id, latitude, longitude FROM {table} "
+                "WHERE id > :last_id AND lat IS NULL AND lng IS NULL ORDER BY id LIMIT :batch"
+            ),
+            {"last_id": last_id, "batch": BACKFILL_BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        values = [
+            {"id": row_id, "lat": parse_coordinate(latitude), "lng": parse_coordinate(longitude)}
+            for row_id, latitude, longitude in rows
+        ]
+        values = [v for v in values if v["lat"] is not None or v["lng"] is not None]
+        if values:
+            ctx.conn.execute(text(f"UPDATE {table} SET lat = :lat, lng = :lng WHERE id = :id"), values)
+            updated += len(values)
+        ctx.conn.commit()
+        if BACKFILL_PAUSE:
+            time.sleep(BACKFILL_PAUSE)
+    print(f"  ~ backfill {table}: {updated} row(s) updated")
+
+
+def upgrade(ctx):
+    for table in PROVIDER_TABLES:
+        ctx.add_column(table, "lat", Float())
+        ctx.add_column(table, "lng", Float())
+        backfill_coordinates(ctx, table)
+        ctx.create_index(table, f"ix_{table}_lat_lng", ["lat", "lng"])
@@ -0,0 +1 @@
+"""Numbered schema migrations; run them with ``python migrate.py``."""
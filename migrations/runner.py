@@ -0,0 +1,224 @@
+"""
+Versioned schema migrations for MySQL and SQLite.
+
+Each ``migrations/NNNN_name.py`` module defines ``upgrade(ctx)`` and is
+applied once, in version order; applied versions are recorded in the
+``schema_version`` table. ``MigrationContext`` helpers are idempotent (they
+inspect the live schema first), so re-running a half-applied migration is
+safe. On MySQL, columns and indexes are added with ``ALGORITHM=INPLACE,
+LOCK=NONE`` so reads and writes continue during the change, and data fixes
+go through ``backfill``, which updates in primary-key chunks and commits
+after each one instead of holding one long transaction.
+"""
+import importlib.util
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.types import TypeEngine
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKFILL_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "1000"))
+BACKFILL_PAUSE = float(os.getenv("MIGRATION_BATCH_PAUSE", "0.05"))  # seconds between batches
+
+_MIGRATION_FILE_RE = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable
+
+
+def discover_migrations(directory: str = MIGRATIONS_DIR) -> list[Migration]:
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _MIGRATION_FILE_RE.match(filename)
+        if not match:
+            continue
+        spec = importlib.util.spec_from_file_location(f"migrations.m{match.group(1)}", os.path.join(directory, filename))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        migrations.append(Migration(int(match.group(1)), match.group(2), module.upgrade))
+
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError("Duplicate migration version numbers")
+    return migrations
+
+
+def ensure_version_table(conn) -> None:
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+    conn.commit()
+
+
+def applied_versions(conn) -> set[int]:
+    if not inspect(conn).has_table("schema_version"):
+        return set()
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_version"))}
+
+
+def record_version(conn, migration: Migration) -> None:
+    conn.execute(
+        text("INSERT INTO schema_version (version, name) VALUES (:version, :name)"),
+        {"version": migration.version, "name": migration.name},
+    )
+    conn.commit()
+
+
+class MigrationContext:
+    """Schema operations available to a migration's ``upgrade(ctx)``.
+
+    In dry-run mode every statement is printed instead of executed.
+    """
+
+    def __init__(self, conn, dry_run: bool = False):
+        self.conn = conn
+        self.dry_run = dry_run
+        self.dialect = conn.dialect.name
+
+    @property
+    def is_mysql(self) -> bool:
+        return self.dialect == "mysql"
+
+    def execute(self, sql: str, params: Optional[dict] = None):
+        if self.dry_run:
+            print(f"    [dry-run] {' '.join(sql.split())}" + (f"  {params}" if params else ""))
+            return None
+        result = self.conn.execute(text(sql), params or {})
+        self.conn.commit()
+        return result
+
+    def _online(self, sql: str) -> str:
+        return sql + ", ALGORITHM=INPLACE, LOCK=NONE" if self.is_mysql else sql
+
+    def has_column(self, table: str, column: str) -> bool:
+        return column in {c["name"] for c in inspect(self.conn).get_columns(table)}
+
+    def has_index(self, table: str, name: str) -> bool:
+        return name in {i["name"] for i in inspect(self.conn).get_indexes(table)}
+
+    def add_column(
+        self,
+        table: str,
+        column: str,
+        type_: TypeEngine,
+        *,
+        nullable: bool = True,
+        default: Optional[str] = None,
+        references: Optional[str] = None,
+    ) -> None:
+        """Add a column unless it exists. ``default`` is a SQL literal, ``references`` e.g. "users(id)"."""
+        if self.has_column(table, column):
+            print(f"  ✓ {table}.{column} already exists")
+            return
+        ddl = f"{column} {type_.compile(dialect=self.conn.dialect)}"
+        if default is not None:
+            ddl += f" DEFAULT {default}"
+        if not nullable:
+            ddl += " NOT NULL"
+        if references and not self.is_mysql:
+            # SQLite can't add constraints later, but accepts an inline reference
+            ddl += f" REFERENCES {references}"
+
+        print(f"  + {table}.{column}")
+        self.execute(self._online(f"ALTER TABLE {table} ADD COLUMN {ddl}"))
+        if references and self.is_mysql:
+            # Adding a foreign key needs a table copy unless foreign_key_checks is off
+            self.execute("SET foreign_key_checks = 0")
+            self.execute(self._online(
+                f"ALTER TABLE {table} ADD CONSTRAINT fk_{table}_{column} "
+                f"FOREIGN KEY ({column}) REFERENCES {references}"
+            ))
+            self.execute("SET foreign_key_checks = 1")
+
+    def create_index(self, table: str, name: str, columns: list[str], *, unique: bool = False) -> None:
+        if self.has_index(table, name):
+            print(f"  ✓ {name} already exists")
+            return
+        print(f"  + {name}")
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        if self.is_mysql:
+            self.execute(self._online(f"ALTER TABLE {table} ADD {kind} {name} ({', '.join(columns)})"))
+        else:
+            self.execute(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})")
+
+    def backfill(
+        self,
+        table: str,
+        assignments: str,
+        where: str,
+        *,
+        batch_size: int = BACKFILL_BATCH_SIZE,
+        pause: float = BACKFILL_PAUSE,
+    ) -> int:
+        """``UPDATE table SET assignments WHERE where`` in primary-key chunks.
+
+        Each chunk commits on its own, so row locks are held for one batch at
+        a time and a failed run can simply be restarted. Returns rows updated.
+        """
+        low, high = self.conn.execute(text(f"SELECT MIN(id), MAX(id) FROM {table}")).one()
+        if low is None:
+            print(f"  ✓ {table} is empty, nothing to backfill")
+            return 0
+
+        statement = f"UPDATE {table} SET {assignments} WHERE id >= :start AND id < :end AND ({where})"
+        batches = (high - low) // batch_size + 1
+        print(f"  ~ backfill {table}: {batches} batch(es) of {batch_size} ids")
+        if self.dry_run:
+            self.execute(statement, {"start": low, "end": low + batch_size})
+            return 0
+
+        updated = 0
+        for start in range(low, high + 1, batch_size):
+            result = self.execute(statement, {"start": start, "end": start + batch_size})
+            updated += result.rowcount
+            if pause:
+                time.sleep(pause)
+        print(f"    {updated} row(s) updated")
+        return updated
+
+
+def pending_migrations(engine) -> list[Migration]:
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+    return [m for m in discover_migrations() if m.version not in done]
+
+
+def run_migrations(engine, *, dry_run: bool = False, target: Optional[int] = None) -> list[Migration]:
+    """Apply pending migrations up to ``target`` (all by default); returns those applied."""
+    applied = []
+    with engine.connect() as conn:
+        if not dry_run:
+            ensure_version_table(conn)
+        done = applied_versions(conn)
+        ctx = MigrationContext(conn, dry_run=dry_run)
+        for migration in discover_migrations():
+            if migration.version in done or (target is not None and migration.version > target):
+                continue
+            print(f"→ {migration.version:04d}_{migration.name}")
+            migration.upgrade(ctx)
+            if not dry_run:
+                record_version(conn, migration)
+            applied.append(migration)
+    return applied
+
+
+def stamp_all(engine) -> None:
+    """Mark every migration as applied (for a schema just built by create_all)."""
+    with engine.connect() as conn:
+        ensure_version_table(conn)
+        done = applied_versions(conn)
+        for migration in discover_migrations():
+            if migration.version not in done:
+                record_version(conn, migration)
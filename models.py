@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Enum, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
+import math
+from typing import Optional
 import enum
 
 Base = declarative_base()
@@ -62,6 +64,7 @@ class Consultation(Base):
     symptoms = Column(Text, nullable=False)
     image_path = Column(String(500))
     ai_response = Column(Text)
+    summary_pending = Column(Boolean, default=False, index=True)
     priority = Column(Enum(PriorityLevel), default=PriorityLevel.LOW)
     first_aid_suggestions = Column(Text)
     recommended_specialization = Column(String(255))
@@ -72,17 +75,50 @@ class Consultation(Base):
     is_synced = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     created_offline = Column(Boolean, default=False)
+    client_id = Column(String(64), nullable=True)  # id generated by the offline client, for idempotent sync
     
     user = relationship("User", back_populates="consultations", foreign_keys="Consultation.user_id")
     supervising_admin = relationship("User", foreign_keys="Consultation.supervising_admin_id")
 
+    # Keyset pagination walks (created_at, id) newest first, overall and per patient;
+    # the admin case queue filters by status/priority or supervising admin first
+    __table_args__ = (
+        Index("ix_consultations_created_at_id", "created_at", "id"),
+        Index("ix_consultations_user_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_consultations_status_priority_created_at", "status", "priority", "created_at"),
+        Index("ix_consultations_supervising_admin_created_at", "supervising_admin_id", "created_at"),
+        Index("ux_consultations_user_client_id", "user_id", "client_id", unique=True),
+        # Uploaded images are shared by content hash; deletes check for remaining references
+        Index("ix_consultations_image_path", "image_path"),
+    )
 
-class Doctor(Base):
+
+def parse_coordinate(value) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+class Located:
+    """Numeric copies of the latitude/longitude strings, for distance queries."""
+
+    lat = Column(Float)
+    lng = Column(Float)
+
+    @validates("latitude", "longitude")
+    def _sync_coordinates(self, key, value):
+        setattr(self, "lat" if key == "latitude" else "lng", parse_coordinate(value))
+        return value
+
+
+class Doctor(Located, Base):
     __tablename__ = "doctors"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
-    specialization = Column(String(255), nullable=False)
+    specialization = Column(String(255), nullable=False, index=True)
     qualification = Column(String(255))
     phone = Column(String(20))
     hospital = Column(String(255))
@@ -92,8 +128,10 @@ class Doctor(Base):
     latitude = Column(String(50))
     longitude = Column(String(50))
 
+    __table_args__ = (Index("ix_doctors_lat_lng", "lat", "lng"),)
+
 
-class Hospital(Base):
+class Hospital(Located, Base):
     __tablename__ = "hospitals"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -106,8 +144,10 @@ class Hospital(Base):
     longitude = Column(String(50))
     facilities = Column(Text)
 
+    __table_args__ = (Index("ix_hospitals_lat_lng", "lat", "lng"),)
 
-class NGO(Base):
+
+class NGO(Located, Base):
     __tablename__ = "ngos"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -119,3 +159,5 @@ class NGO(Base):
     latitude = Column(String(50))
     longitude = Column(String(50))
     working_areas = Column(Text)
+
+    __table_args__ = (Index("ix_ngos_lat_lng", "lat", "lng"),)
@@ -0,0 +1,49 @@
+"""
+Keyset (cursor) pagination.
+
+Listings are ordered newest first on ``(created_at, id)``. Instead of an
+OFFSET, each page carries an opaque cursor holding the last row's
+``(created_at, id)``, and the next page starts strictly after it, so walking
+deep into a listing costs the same as reading the first page.
+"""
+import base64
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of ``encode_cursor``; raises ValueError for malformed cursors."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode("ascii").split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_page(query, created_at_column, id_column, cursor: Optional[str], limit: int):
+    """Fetch one page newest-first; returns (rows, next_cursor).
+
+    ``next_cursor`` is None on the last page. One extra row is fetched to
+    tell whether another page exists.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            created_at_column < created_at,
+            and_(created_at_column == created_at, id_column < row_id),
+        ))
+    rows = query.order_by(created_at_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
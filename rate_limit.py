@@ -0,0 +1,70 @@
+"""
+In-process sliding-window rate limiting.
+
+Used to cap login and registration attempts per username and per client IP
+so a burst of guesses cannot monopolise the password hashing pool. Attempts
+are recorded up front, so concurrent guesses are capped too, and successful
+logins are refunded: many patients behind one clinic NAT only run into the
+IP limit when they get their passwords wrong.
+"""
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+LOGIN_ATTEMPTS_PER_USERNAME = int(os.getenv("LOGIN_ATTEMPTS_PER_USERNAME", "10"))
+LOGIN_ATTEMPTS_PER_IP = int(os.getenv("LOGIN_ATTEMPTS_PER_IP", "30"))
+REGISTRATIONS_PER_IP = int(os.getenv("REGISTRATIONS_PER_IP", "100"))
+LOGIN_RATE_WINDOW = float(os.getenv("LOGIN_RATE_WINDOW", "300"))  # seconds
+
+
+class SlidingWindowLimiter:
+    """Allow at most ``limit`` hits per key within any ``window`` seconds."""
+
+    def __init__(self, limit: int, window: float, max_keys: int = 10000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._hits = {}  # key -> deque of timestamps
+        self._lock = threading.Lock()
+
+    def hit(self, key: str) -> Optional[int]:
+        """Record an attempt; returns seconds to wait if over the limit, else None."""
+        if self.limit <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                if len(self._hits) >= self.max_keys:
+                    self._prune(now)
+                hits = self._hits[key] = deque()
+            while hits and hits[0] <= now - self.window:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                return max(1, math.ceil(hits[0] + self.window - now))
+            hits.append(now)
+            return None
+
+    def refund(self, key: str) -> None:
+        """Take back one recorded attempt, e.g. once it turned out to be legitimate."""
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits:
+                hits.pop()
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._hits.pop(key, None)
+
+    def _prune(self, now: float) -> None:
+        stale = [key for key, hits in self._hits.items() if not hits or hits[-1] <= now - self.window]
+        for key in stale:
+            del self._hits[key]
+
+
+login_username_limiter = SlidingWindowLimiter(LOGIN_ATTEMPTS_PER_USERNAME, LOGIN_RATE_WINDOW)
+login_ip_limiter = SlidingWindowLimiter(LOGIN_ATTEMPTS_PER_IP, LOGIN_RATE_WINDOW)  # failed attempts only
+registration_ip_limiter = SlidingWindowLimiter(REGISTRATIONS_PER_IP, LOGIN_RATE_WINDOW)
@@ -35,6 +35,10 @@ mysql -u root -p'S@mim101' -e "CREATE DATABASE IF NOT EXISTS wecare_db;" 2>/dev/
 echo "✓ Initializing database and seeding data..."
 python seed_data.py
 
+# Apply schema migrations (no-op on a freshly created database)
+echo "✓ Applying schema migrations..."
+python migrate.py
+
 # Check Ollama
 echo "✓ Checking Ollama..."
 if ! command -v ollama &> /dev/null; then
@@ -73,6 +73,68 @@ class WeCareAPI {
         });
     }
 
+    // Streaming consultation (Server-Sent Events over a POST response body).
+    // Calls onToken(text) for each generated chunk, onReplace(text) if the answer
+    // was rewritten, and resolves with the final result object.
+    async createConsultationStream(formData, { onToken, onReplace } = {}) {
+        const headers = {};
+        const token = this.token || localStorage.getItem('wecare_token');
+        if (token) {
+            headers['Authorization'] = `Bearer ${token}`;
+        }
+
+        const response = await fetch(`${this.baseURL}/api/consultation/stream`, {
+            method: 'POST',
+            body: formData,
+            headers,
+        });
+
+        if (!response.ok) {
+            const error = await response.json().catch(() => ({ detail: 'Request failed' }));
+            throw new Error(error.detail || `HTTP ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let result = null;
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const raw = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                let data = '';
+                for (const line of raw.split('\n')) {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                }
+                if (!data) continue;
+                const payload = JSON.parse(data);
+
+                if (event === 'token') onToken?.(payload.text);
+                else if (event === 'replace') onReplace?.(payload.text);
+                else if (event === 'result') result = payload;
+                else if (event === 'error') throw new Error(payload.detail);
+            }
+        }
+
+        if (!result) {
+            throw new Error('Consultation stream ended unexpectedly');
+        }
+        return result;
+    }
+
+    supportsStreaming() {
+        return typeof ReadableStream !== 'undefined' && typeof TextDecoder !== 'undefined';
+    }
+
     async syncConsultations(consultations) {
         return this.request('/api/sync/consultations', {
             method: 'POST',
@@ -93,8 +155,18 @@ class WeCareAPI {
         return this.request('/api/ngos');
     }
 
-    async getConsultationHistory() {
-        return this.request('/api/consultations/history');
+    async getNearby(lat, lng, { k = 10, kind = null, emergency = false, specialization = null, maxKm = null } = {}) {
+        const params = new URLSearchParams({ lat, lng, k });
+        if (kind) params.set('kind', kind);
+        if (emergency) params.set('emergency', 'true');
+        if (specialization) params.set('specialization', specialization);
+        if (maxKm !== null) params.set('max_km', maxKm);
+        return this.request(`/api/nearby?${params}`);
+    }
+
+    async getConsultationHistory(cursor = null) {
+        const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        return this.request(`/api/consultations/history${params}`);
     }
 
     async deleteConsultation(consultationId) {
@@ -140,6 +212,9 @@ class WeCareAPI {
 // Initialize API client
 const api = new WeCareAPI();
 
+// Offline consultations are sent in batches of this size
+const SYNC_BATCH_SIZE = 200;
+
 // Network status management
 let isOnline = navigator.onLine;
 
@@ -167,24 +242,36 @@ async function syncOfflineData() {
 
         console.log(`Syncing ${unsyncedConsultations.length} offline consultations...`);
         
-        const payload = unsyncedConsultations.map(c => ({
-            symptoms: c.symptoms,
-            ai_response: c.ai_response,
-            priority: c.priority,
-            first_aid_suggestions: c.first_aid_suggestions,
-            recommended_specialization: c.recommended_specialization,
-            created_at: c.created_at,
-            use_history: c.use_history
-        }));
-
-        await api.syncConsultations(payload);
-
-        // Mark as synced
-        for (const consultation of unsyncedConsultations) {
-            await db.markConsultationSynced(consultation.id);
+        let synced = 0;
+        let failed = 0;
+        for (let i = 0; i < unsyncedConsultations.length; i += SYNC_BATCH_SIZE) {
+            const batch = unsyncedConsultations.slice(i, i + SYNC_BATCH_SIZE);
+            const payload = batch.map(c => ({
+                client_id: c.client_id,
+                symptoms: c.symptoms,
+                ai_response: c.ai_response,
+                priority: c.priority,
+                first_aid_suggestions: c.first_aid_suggestions,
+                recommended_specialization: c.recommended_specialization,
+                created_at: c.created_at,
+                use_history: c.use_history
+            }));
+
+            const response = await api.syncConsultations(payload);
+
+            // Mark exactly what the server stored (or already had) as synced
+            for (const result of response.results) {
+                if (result.status === 'created' || result.status === 'duplicate') {
+                    await db.markConsultationSynced(batch[result.index].id);
+                    synced++;
+                } else {
+                    console.warn('Consultation not synced:', result.error);
+                    failed++;
+                }
+            }
         }
 
-        console.log('✅ Sync complete');
+        console.log(`✅ Sync complete (${synced} synced, ${failed} rejected)`);
         showNotification('Offline data synced successfully', 'success');
     } catch (error) {
         console.error('Sync error:', error);
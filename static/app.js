@@ -181,7 +181,20 @@ async function handleConsultation(event) {
     try {
         if (api.isOnline()) {
             // Online mode - send to server
-            const result = await api.createConsultation(formData);
+            let result;
+            streamingText = '';
+            if (api.supportsStreaming()) {
+                result = await api.createConsultationStream(formData, {
+                    onToken: (text) => {
+                        clearInterval(messageInterval);
+                        submitBtn.textContent = 'Writing answer...';
+                        appendStreamingResponse(text);
+                    },
+                    onReplace: (text) => showStreamingResponse(text),
+                });
+            } else {
+                result = await api.createConsultation(formData);
+            }
             clearInterval(messageInterval);
             displayConsultationResult(result);
             showNotification('Consultation complete!', 'success');
@@ -259,7 +272,22 @@ Recommended: ${specialization} specialist`;
     };
 }
 
+// Show the model answer while it is still being streamed
+let streamingText = '';
+
+function showStreamingResponse(text) {
+    streamingText = text;
+    document.getElementById('consultation-result').classList.remove('hidden');
+    document.getElementById('ai-response').textContent = streamingText;
+}
+
+function appendStreamingResponse(text) {
+    showStreamingResponse(streamingText + text);
+}
+
 function displayConsultationResult(result) {
+    streamingText = '';
+
     document.getElementById('consultation-result').classList.remove('hidden');
     
     // Priority badge
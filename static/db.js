@@ -54,19 +54,37 @@ class WeCareDB {
         });
     }
 
+    generateClientId() {
+        if (window.crypto?.randomUUID) {
+            return crypto.randomUUID();
+        }
+        return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+    }
+
     async addConsultation(consultation) {
         const tx = this.db.transaction(['consultations'], 'readwrite');
         const store = tx.objectStore('consultations');
-        return store.add(consultation);
+        // client_id lets the server drop duplicates when a sync is retried
+        return store.add({ client_id: this.generateClientId(), ...consultation });
     }
 
     async getUnsyncedConsultations() {
-        const tx = this.db.transaction(['consultations'], 'readonly');
+        // Booleans aren't valid IndexedDB keys, so filter instead of querying the 'synced' index
+        const tx = this.db.transaction(['consultations'], 'readwrite');
         const store = tx.objectStore('consultations');
-        const index = store.index('synced');
         return new Promise((resolve, reject) => {
-            const request = index.getAll(false);
-            request.onsuccess = () => resolve(request.result);
+            const request = store.getAll();
+            request.onsuccess = () => {
+                const unsynced = request.result.filter(c => !c.synced);
+                // Older records predate client_id; give them one before they are sent
+                for (const consultation of unsynced) {
+                    if (!consultation.client_id) {
+                        consultation.client_id = this.generateClientId();
+                        store.put(consultation);
+                    }
+                }
+                resolve(unsynced);
+            };
             request.onerror = () => reject(request.error);
         });
     }
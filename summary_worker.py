@@ -0,0 +1,120 @@
+"""
+Background summarization of stored consultations.
+
+The consultation endpoint stores the full AI response and marks the row with
+``summary_pending``; this worker later replaces it with a short summary. The
+pending flag lives in the database, so jobs interrupted by a restart are
+picked up again on the next startup.
+"""
+import asyncio
+import os
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import select, update
+
+from database import AsyncSessionLocal
+from models import Consultation
+
+SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "2"))
+SUMMARY_MAX_ATTEMPTS = int(os.getenv("SUMMARY_MAX_ATTEMPTS", "3"))
+SUMMARY_RETRY_DELAY = float(os.getenv("SUMMARY_RETRY_DELAY", "5"))
+
+
+def fallback_summary(full_response: str) -> str:
+    return full_response[:200] + "..."
+
+
+class SummaryWorker:
+    """Asyncio job queue that fills in consultation summaries with bounded concurrency."""
+
+    def __init__(
+        self,
+        summarize: Callable[[str], Awaitable[str]],
+        *,
+        concurrency: int = SUMMARY_WORKERS,
+        max_attempts: int = SUMMARY_MAX_ATTEMPTS,
+        retry_delay: float = SUMMARY_RETRY_DELAY,
+    ):
+        self.summarize = summarize
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.queue: Optional[asyncio.Queue] = None
+        self.tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the worker tasks and re-queue summaries left pending in the database."""
+        self.queue = asyncio.Queue()
+        self.tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+        async with AsyncSessionLocal() as db:
+            pending = (await db.execute(
+                select(Consultation.id).where(
+                    Consultation.summary_pending == True
+                ).order_by(Consultation.id)
+            )).scalars().all()
+        for consultation_id in pending:
+            self.enqueue(consultation_id)
+        if pending:
+            print(f"Re-queued {len(pending)} pending consultation summaries")
+
+    async def stop(self) -> None:
+        """Cancel the worker tasks; unfinished jobs stay pending in the database."""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.queue = None
+
+    def enqueue(self, consultation_id: int, attempt: int = 1) -> None:
+        if self.queue is None:
+            # Not running (e.g. during scripts); the row stays pending for the next startup.
+            return
+        self.queue.put_nowait((consultation_id, attempt))
+
+    def pending_count(self) -> int:
+        return self.queue.qsize() if self.queue is not None else 0
+
+    async def _run(self) -> None:
+        while True:
+            consultation_id, attempt = await self.queue.get()
+            try:
+                await self._process(consultation_id, attempt)
+            except Exception as e:
+                print(f"Summary job for consultation {consultation_id} crashed: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _process(self, consultation_id: int, attempt: int) -> None:
+        # Don't hold a pooled connection while the model is running.
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(
+                select(Consultation.ai_response, Consultation.summary_pending).where(
+                    Consultation.id == consultation_id
+                )
+            )).first()
+        if row is None or not row.summary_pending:
+            return
+        full_response = row.ai_response or ""
+
+        try:
+            summary = await self.summarize(full_response)
+        except Exception as e:
+            if attempt < self.max_attempts:
+                print(f"Summary attempt {attempt} for consultation {consultation_id} failed: {e}; retrying")
+                asyncio.get_running_loop().call_later(
+                    self.retry_delay * attempt, self.enqueue, consultation_id, attempt + 1
+                )
+                return
+            print(f"Summary generation failed for consultation {consultation_id}: {e}")
+            summary = fallback_summary(full_response)
+
+        async with AsyncSessionLocal() as db:
+            # No-op if the consultation was deleted while the model was running.
+            await db.execute(
+                update(Consultation).where(
+                    Consultation.id == consultation_id,
+                    Consultation.summary_pending == True,
+                ).values(ai_response=summary, summary_pending=False)
+            )
+            await db.commit()
@@ -0,0 +1,10 @@
+"""Point the app at a throwaway SQLite database before any test imports it."""
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp()
+# TEST_DATABASE_URL runs the suite against a scratch MySQL database instead; its tables are dropped
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("OLLAMA_HOST", "http://127.0.0.1:9")  # tests never reach a real model server
@@ -0,0 +1,61 @@
+"""Query-count regression tests for the admin consultation list."""
+import pytest
+from sqlalchemy import event
+
+import app
+from database import SessionLocal, engine
+from models import Base, Consultation, ConsultationStatus, PriorityLevel, User
+
+
+@pytest.fixture(scope="module")
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    admin = User(username="admin", email="admin@example.com", hashed_password="x", is_admin=True)
+    session.add(admin)
+    session.flush()
+    for n in range(30):
+        patient = User(username=f"patient{n}", email=f"patient{n}@example.com", hashed_password="x")
+        session.add(patient)
+        session.flush()
+        session.add(Consultation(
+            user_id=patient.id,
+            symptoms="fever",
+            priority=PriorityLevel.MEDIUM,
+            status=ConsultationStatus.UNDER_SUPERVISION if n % 2 else ConsultationStatus.PENDING,
+            supervising_admin_id=admin.id if n % 2 else None,
+        ))
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def count_queries(func):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return result, len(statements)
+
+
+def list_consultations(db, limit):
+    admin = db.query(User).filter(User.is_admin.is_(True)).one()
+    db.expire_all()  # start each page cold, as a fresh request would
+    return app.get_all_consultations(limit=limit, current_admin=admin, db=db)
+
+
+def test_admin_consultations_query_count_is_constant(db):
+    small, small_queries = count_queries(lambda: list_consultations(db, 5))
+    large, large_queries = count_queries(lambda: list_consultations(db, 30))
+
+    assert len(small["consultations"]) == 5
+    assert len(large["consultations"]) == 30
+    assert any(c["supervising_admin"] == "admin" for c in large["consultations"])
+    assert small_queries == large_queries
@@ -0,0 +1,65 @@
+"""Failures that happen after the SSE response has started become ``error`` events."""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+import llm_client
+from llm_scheduler import scheduler
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def headers(client):
+    response = client.post(
+        "/api/auth/register",
+        json={"username": "streamer", "email": "streamer@example.com", "password": "secret"},
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def saturated(monkeypatch):
+    monkeypatch.setattr(scheduler, "active", scheduler.max_concurrency)
+    monkeypatch.setattr(scheduler, "max_queue", 0)
+
+
+def sse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        events.append((lines.get("event"), json.loads(lines.get("data", "null"))))
+    return events
+
+
+def test_overloaded_queue_returns_503(client, headers, saturated):
+    response = client.post("/api/consultation", data={"symptoms": "busy queue, plain"}, headers=headers)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
+
+
+def test_overloaded_queue_streams_error_event(client, headers, saturated):
+    response = client.post("/api/consultation/stream", data={"symptoms": "busy queue, streamed"}, headers=headers)
+    assert response.status_code == 200
+    (kind, data), = sse_events(response.text)
+    assert kind == "error"
+    assert data["detail"] == app.LLM_BUSY_DETAIL
+    assert data["retry_after"] >= 1
+
+
+def test_unreachable_model_streams_error_event(client, headers, monkeypatch):
+    async def timeout(*args, **kwargs):
+        raise llm_client.httpx.ConnectTimeout("timed out")
+
+    monkeypatch.setattr(llm_client, "open_stream", timeout)
+    response = client.post("/api/consultation/stream", data={"symptoms": "model server down"}, headers=headers)
+    (kind, data), = sse_events(response.text)
+    assert kind == "error"
+    assert "Could not connect" in data["detail"]
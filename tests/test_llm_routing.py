@@ -0,0 +1,90 @@
+"""Routing, ejection and retry across several fake Ollama hosts."""
+import asyncio
+from collections import Counter
+
+import httpx
+import pytest
+
+import llm_client
+from llm_backends import Backend, BackendPool
+
+
+def fake_hosts(behaviour: dict):
+    """MockTransport where each host refuses, answers 500, or answers 200."""
+    served = Counter()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        served[host] += 1
+        if behaviour.get(host) == "refuse":
+            raise httpx.ConnectError("connection refused", request=request)
+        if behaviour.get(host) == "error":
+            return httpx.Response(500, json={"error": "model crashed"})
+        return httpx.Response(200, json={"response": f"answer from {host}"})
+
+    return httpx.MockTransport(handler), served
+
+
+@pytest.fixture
+def route(monkeypatch):
+    """Install a pool of ``hosts`` behind a mock transport; returns per-host request counts."""
+    def install(hosts, behaviour=None, strategy="least_outstanding"):
+        transport, served = fake_hosts(behaviour or {})
+        backends = [Backend(f"http://{name}:11434", weight) for name, weight in hosts]
+        monkeypatch.setattr(llm_client, "pool", BackendPool(backends, strategy=strategy))
+        monkeypatch.setattr(llm_client, "_client", httpx.AsyncClient(transport=transport))
+        return llm_client.pool, served
+    return install
+
+
+def generate_many(n: int) -> list:
+    async def run():
+        return [(await llm_client.generate({"prompt": "hi"})).json()["response"] for _ in range(n)]
+    return asyncio.run(run())
+
+
+def test_refused_host_is_retried_elsewhere_and_ejected(route):
+    pool, served = route([("down", 1), ("up", 1)], {"down": "refuse"}, strategy="weighted_round_robin")
+
+    answers = generate_many(4)
+
+    assert answers == ["answer from up"] * 4
+    assert served["down"] == 1  # ejected after the first refusal
+    down = pool.backends[0]
+    assert not down.healthy and down.failures == 1
+    assert all(b.outstanding == 0 for b in pool.backends)
+
+
+def test_5xx_is_retried_on_another_host(route):
+    pool, served = route([("broken", 1), ("ok", 1)], {"broken": "error"})
+
+    assert generate_many(1) == ["answer from ok"]
+    assert served == {"broken": 1, "ok": 1}
+    assert not pool.backends[0].healthy
+
+
+def test_last_host_error_is_returned_when_all_fail(route):
+    pool, served = route([("a", 1), ("b", 1)], {"a": "error", "b": "error"})
+
+    async def run():
+        return await llm_client.generate({"prompt": "hi"})
+
+    assert asyncio.run(run()).status_code == 500
+    assert served == {"a": 1, "b": 1}
+
+
+def test_all_hosts_refusing_raises_connect_error(route):
+    route([("a", 1), ("b", 1)], {"a": "refuse", "b": "refuse"})
+
+    with pytest.raises(httpx.ConnectError):
+        generate_many(1)
+
+
+def test_weighted_round_robin_splits_by_weight(route):
+    _, served = route([("a", 1), ("b", 1), ("c", 1)], strategy="weighted_round_robin")
+    generate_many(300)
+    assert served == {"a": 100, "b": 100, "c": 100}
+
+    _, served = route([("big", 3), ("small", 1)], strategy="weighted_round_robin")
+    generate_many(400)
+    assert served == {"big": 300, "small": 100}
@@ -0,0 +1,44 @@
+"""Only failed logins count against the per-IP limit shared by everyone behind a NAT."""
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+from rate_limit import SlidingWindowLimiter
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app.app) as client:
+        yield client
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(app, "login_ip_limiter", SlidingWindowLimiter(3, 300))
+    monkeypatch.setattr(app, "login_username_limiter", SlidingWindowLimiter(10, 300))
+    monkeypatch.setattr(app, "registration_ip_limiter", SlidingWindowLimiter(100, 300))
+
+
+def register(client, username: str) -> None:
+    response = client.post(
+        "/api/auth/register",
+        json={"username": username, "email": f"{username}@example.com", "password": "secret"},
+    )
+    assert response.status_code == 200
+
+
+def login(client, username: str, password: str = "secret") -> int:
+    return client.post("/api/auth/login", json={"username": username, "password": password}).status_code
+
+
+def test_successful_logins_do_not_use_up_the_ip_limit(client, limits):
+    for n in range(5):
+        register(client, f"clinic{n}")  # more accounts than the IP limit allows failures
+    assert [login(client, f"clinic{n}") for n in range(5) for _ in range(2)] == [200] * 10
+
+
+def test_failed_logins_are_limited_per_ip(client, limits):
+    register(client, "guessed")
+    assert [login(client, "guessed", "wrong") for _ in range(3)] == [401] * 3
+    assert login(client, "guessed", "wrong") == 429
+    assert login(client, "guessed") == 429  # the IP is locked out until the window passes
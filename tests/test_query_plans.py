@@ -0,0 +1,117 @@
+"""The hot consultation listings are planned on their composite indexes.
+
+Each test runs the real endpoint function, captures the SQL it sends
+(keyset cursor predicate, joinedload joins and all) and checks the
+database's plan for it: EXPLAIN QUERY PLAN on SQLite, or the ``key`` column
+of EXPLAIN on MySQL when TEST_DATABASE_URL points there. On MySQL, run
+ANALYZE TABLE first if the tables hold real data.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+import app
+from auth import UserIdentity
+from database import SessionLocal, engine
+from models import Base, Consultation, ConsultationStatus, PriorityLevel, User
+
+
+@pytest.fixture(scope="module")
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    admin = User(username="plan-admin", email="plan-admin@example.com", hashed_password="x", is_admin=True)
+    patient = User(username="plan-patient", email="plan-patient@example.com", hashed_password="x")
+    session.add_all([admin, patient])
+    session.flush()
+    started = datetime(2026, 1, 1)
+    statuses = list(ConsultationStatus)
+    priorities = list(PriorityLevel)
+    for n in range(60):
+        session.add(Consultation(
+            user_id=patient.id,
+            symptoms="fever",
+            priority=priorities[n % len(priorities)],
+            status=statuses[n % len(statuses)],
+            supervising_admin_id=admin.id if n % 2 else None,
+            created_at=started + timedelta(minutes=n),
+        ))
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def consultation_selects(func) -> list:
+    """Run ``func`` and return the (statement, parameters) it sent for consultations."""
+    sent = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM consultations" in statement:
+            sent.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert sent, "no consultation query was issued"
+    return sent
+
+
+def indexes_used(statement: str, parameters) -> set:
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            return {word for row in rows for word in row[-1].split()}
+        # MySQL lists candidate indexes in possible_keys; only ``key`` is the one chosen
+        rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().all()
+        return {row["key"] for row in rows if row["key"]}
+
+
+def assert_uses_index(func, index_name: str) -> None:
+    for statement, parameters in consultation_selects(func):
+        assert index_name in indexes_used(statement, parameters), statement
+
+
+def second_page(endpoint, **kwargs):
+    """Call a cursor-paginated endpoint twice, returning a thunk for the page after the first."""
+    first = endpoint(cursor=None, **kwargs)
+    assert first["next_cursor"]
+    return lambda: endpoint(cursor=first["next_cursor"], **kwargs)
+
+
+def no_filters(**overrides) -> dict:
+    filters = dict(priority=None, status=None, specialization=None, date_from=None, date_to=None)
+    filters.update(overrides)
+    return filters
+
+
+def admin_list(db, **filters):
+    admin = db.query(User).filter(User.username == "plan-admin").one()
+    return second_page(
+        app.get_all_consultations, limit=3, current_admin=admin, db=db,
+        supervising_admin_id=filters.pop("supervising_admin_id", None), **no_filters(**filters),
+    )
+
+
+def test_patient_history_page_uses_user_index(db):
+    patient = db.query(User).filter(User.username == "plan-patient").one()
+    identity = UserIdentity(patient.id, patient.username, False)
+    page = second_page(app.get_consultation_history, limit=3, current_user=identity, db=db, **no_filters())
+    assert_uses_index(page, "ix_consultations_user_created_at_id")
+
+
+def test_admin_list_uses_created_at_index(db):
+    assert_uses_index(admin_list(db), "ix_consultations_created_at_id")
+
+
+def test_admin_case_queue_uses_status_priority_index(db):
+    page = admin_list(db, status=ConsultationStatus.PENDING, priority=PriorityLevel.LOW)
+    assert_uses_index(page, "ix_consultations_status_priority_created_at")
+
+
+def test_supervised_cases_use_supervising_admin_index(db):
+    admin = db.query(User).filter(User.username == "plan-admin").one()
+    assert_uses_index(admin_list(db, supervising_admin_id=admin.id), "ix_consultations_supervising_admin_created_at")
@@ -0,0 +1,64 @@
+"""In-flight uploads are never deleted by a concurrent orphan cleanup."""
+import threading
+
+import pytest
+
+from upload_storage import InFlightKeys, LocalStorage, content_key
+
+DATA = b"\xff\xd8 not really a jpeg"
+KEY = content_key(DATA, "jpg")
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorage(str(tmp_path / "uploads"))
+
+
+def test_cleanup_skips_keys_in_flight(storage):
+    in_flight = InFlightKeys()
+    in_flight.store(KEY, lambda: storage.put(KEY, DATA))
+
+    assert not in_flight.delete_if_idle(KEY, lambda: storage.delete(KEY))
+    assert storage.exists(KEY)
+
+    in_flight.release(KEY)
+    assert in_flight.delete_if_idle(KEY, lambda: storage.delete(KEY))
+    assert not storage.exists(KEY)
+
+
+def test_store_waits_for_a_cleanup_already_deleting(storage):
+    """The old check-then-act order let a repeat upload reuse a file cleanup then removed."""
+    in_flight = InFlightKeys()
+    storage.put(KEY, DATA)  # left by a consultation that was just deleted
+    deleting, resume = threading.Event(), threading.Event()
+
+    def slow_delete():
+        deleting.set()
+        resume.wait(5)
+        storage.delete(KEY)
+
+    cleanup = threading.Thread(target=in_flight.delete_if_idle, args=(KEY, slow_delete))
+    upload = threading.Thread(target=in_flight.store, args=(KEY, lambda: storage.put(KEY, DATA)))
+    cleanup.start()
+    assert deleting.wait(5)
+    upload.start()
+    upload.join(0.2)
+    assert upload.is_alive()  # blocked until the delete has finished
+
+    resume.set()
+    cleanup.join(5)
+    upload.join(5)
+    assert storage.exists(KEY)
+    assert not in_flight.delete_if_idle(KEY, lambda: storage.delete(KEY))
+
+
+def test_failed_store_releases_its_mark(storage):
+    in_flight = InFlightKeys()
+
+    def broken_put():
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        in_flight.store(KEY, broken_put)
+    storage.put(KEY, DATA)
+    assert in_flight.delete_if_idle(KEY, lambda: storage.delete(KEY))
@@ -0,0 +1,114 @@
+"""
+Keyword triage of consultations.
+
+The English and Bengali keyword tables are built once at import time, and
+``triage`` decides priority and specialization together from a single
+lowercased copy of the text. Bengali keywords are skipped entirely for
+pure-ASCII text (``str.isascii`` is O(1) in CPython).
+"""
+from typing import Iterable, Optional
+
+from models import PriorityLevel
+
+BN_SPECIALIZATION_TO_EN = {
+    "সাধারণ চিকিৎসা": "General Medicine",
+    "শিশুরোগ": "Pediatrics",
+    "স্ত্রীরোগ": "Gynecology",
+    "চর্মরোগ": "Dermatology",
+    "হৃদরোগ": "Cardiology",
+    "অর্থোপেডিক্স": "Orthopedics",
+    "কান-নাক-গলা": "ENT",
+    "স্নায়ুরোগ": "Neurology",
+    "গ্যাস্ট্রোএন্টারোলজি": "Gastroenterology",
+}
+
+SPECIALIZATIONS = [
+    "General Medicine", "Pediatrics", "Gynecology", "Dermatology",
+    "Cardiology", "Orthopedics", "ENT", "Neurology", "Gastroenterology"
+]
+
+# (level, English keywords, Bengali keywords), most severe first
+PRIORITY_KEYWORDS = (
+    (
+        PriorityLevel.CRITICAL,
+        (
+            "chest pain", "heart attack", "stroke", "severe bleeding", "unconscious",
+            "breathing difficulty", "severe pain", "emergency", "critical", "urgent care needed",
+        ),
+        (
+            "বুকে ব্যথা", "হার্ট অ্যাটাক", "স্ট্রোক", "অতিরিক্ত রক্তপাত", "অজ্ঞান",
+            "শ্বাসকষ্ট", "তীব্র ব্যথা", "জরুরি", "ইমার্জেন্সি",
+        ),
+    ),
+    (
+        PriorityLevel.HIGH,
+        (
+            "high fever", "severe", "infection", "fracture", "injury", "wound",
+            "urgent", "immediate", "consult immediately",
+        ),
+        (
+            "উচ্চ জ্বর", "তীব্র", "সংক্রমণ", "হাড় ভাঙা", "আঘাত", "ক্ষত",
+            "দ্রুত", "অবিলম্বে", "তাৎক্ষণিক",
+        ),
+    ),
+    (
+        PriorityLevel.MEDIUM,
+        ("fever", "pain", "rash", "cough", "headache", "medical attention"),
+        ("জ্বর", "ব্যথা", "র‍্যাশ", "কাশি", "মাথাব্যথা", "ডাক্তার"),
+    ),
+)
+
+_SPECIALIZATIONS_EN = tuple((spec.lower(), spec) for spec in SPECIALIZATIONS)
+_SPECIALIZATIONS_BN = tuple(BN_SPECIALIZATION_TO_EN.items())
+
+
+def _contains_any(text: str, keywords: tuple) -> bool:
+    for keyword in keywords:
+        if keyword in text:
+            return True
+    return False
+
+
+def _priority(text: str) -> PriorityLevel:
+    text_has_bengali = not text.isascii()
+    for level, english, bengali in PRIORITY_KEYWORDS:
+        if _contains_any(text, english) or (text_has_bengali and _contains_any(text, bengali)):
+            return level
+    return PriorityLevel.LOW
+
+
+def _specialization(response: str) -> Optional[str]:
+    for keyword, spec in _SPECIALIZATIONS_EN:
+        if keyword in response:
+            return spec
+    if not response.isascii():
+        for label, spec in _SPECIALIZATIONS_BN:
+            if label in response:
+                return spec
+    return None
+
+
+def triage(symptoms: str, ai_response: str) -> tuple[PriorityLevel, Optional[str]]:
+    """Return (priority, specialization) for a consultation, lowercasing the text once.
+
+    Priority looks at symptoms and response together; specialization only at
+    the response, English names before Bengali labels.
+    """
+    response = (ai_response or "").lower()
+    text = (symptoms or "").lower() + " " + response
+    return _priority(text), _specialization(response)
+
+
+def analyze_priority(symptoms: str, ai_response: str) -> PriorityLevel:
+    """Analyze symptoms and AI response to determine priority"""
+    return _priority(((symptoms or "") + " " + (ai_response or "")).lower())
+
+
+def extract_specialization(ai_response: str) -> Optional[str]:
+    """Extract recommended doctor specialization from AI response"""
+    return _specialization((ai_response or "").lower())
+
+
+def triage_many(items: Iterable[tuple[str, str]]) -> list[tuple[PriorityLevel, Optional[str]]]:
+    """Triage many (symptoms, ai_response) pairs, e.g. to re-score stored consultations."""
+    return [triage(symptoms, ai_response) for symptoms, ai_response in items]
@@ -0,0 +1,186 @@
+"""
+Content-addressed storage for uploaded consultation images.
+
+Files are named by the SHA-256 of their bytes and sharded into two levels of
+subdirectories (``ab/cd/abcd....jpg``), so identical uploads are stored once
+and no directory grows unbounded. The key is what ``Consultation.image_path``
+records; a file is deleted once no consultation references it any more.
+
+Two backends share the same small interface (put/delete/exists): the local
+filesystem (default) and any S3-compatible object store via boto3, selected
+with UPLOAD_STORAGE=local|s3.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Optional
+
+try:
+    import boto3
+except Exception:  # boto3 is only needed for UPLOAD_STORAGE=s3
+    boto3 = None
+
+UPLOAD_STORAGE = os.getenv("UPLOAD_STORAGE", "local")
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_PREFIX = os.getenv("S3_PREFIX", "uploads/")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")  # e.g. http://localhost:9000 for MinIO
+# How long a freshly stored key is protected from orphan cleanup while its
+# consultation row is still being written (the model call sits in between)
+UPLOAD_IN_FLIGHT_GRACE = float(os.getenv("UPLOAD_IN_FLIGHT_GRACE", "600"))  # seconds
+
+
+def content_key(data, extension: str) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+
+class LocalStorage:
+    """Sharded directories under ``root`` on the local filesystem."""
+
+    def __init__(self, root: str = UPLOAD_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # Rows from before content addressing store "uploads/<file>" paths
+        if key.startswith(self.root + "/") or key.startswith(self.root + os.sep):
+            return key
+        return os.path.join(self.root, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def put(self, key: str, data) -> bool:
+        """Store ``data`` under ``key``; returns False if it was already stored."""
+        path = self._path(key)
+        if os.path.exists(path):
+            return False
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return True
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        # Drop shard directories left empty (never the root itself)
+        directory = os.path.dirname(path)
+        while os.path.abspath(directory) != os.path.abspath(self.root) and directory:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
+
+
+class S3Storage:
+    """Objects under ``prefix`` in an S3-compatible bucket (AWS S3, MinIO, ...)."""
+
+    def __init__(self, bucket: str = S3_BUCKET, prefix: str = S3_PREFIX, client=None):
+        if client is None:
+            if boto3 is None:
+                raise RuntimeError("UPLOAD_STORAGE=s3 requires boto3 (pip install boto3)")
+            client = boto3.client("s3", endpoint_url=S3_ENDPOINT_URL)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _object_key(self, key: str) -> str:
+        return self.prefix + key
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except Exception as exc:
+            status = getattr(exc, "response", {}).get("Error", {}).get("Code")
+            if status in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def put(self, key: str, data) -> bool:
+        if self.exists(key):
+            return False
+        self.client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=bytes(data))
+        return True
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+
+class InFlightKeys:
+    """Keys stored for consultations whose row is not committed yet.
+
+    A repeat upload reuses the existing file before its consultation row
+    exists, so orphan cleanup skips these keys instead of deleting a file a
+    new row is about to reference. Marks are released once the row is saved;
+    ones left by failed requests expire after ``grace`` seconds.
+
+    Storing and cleanup run their check and their write under one lock, so a
+    cleanup can never delete a file between an upload marking it and storing
+    (or reusing) it.
+    """
+
+    def __init__(self, grace: float = UPLOAD_IN_FLIGHT_GRACE):
+        self.grace = grace
+        self._marks = {}  # key -> (requests in flight, monotonic time of the last mark)
+        self._lock = threading.Lock()
+
+    def store(self, key: str, put: Callable[[], object]) -> None:
+        """Mark ``key`` in flight and call ``put`` to store it, atomically with cleanup (blocking)."""
+        with self._lock:
+            count, _ = self._marks.get(key, (0, 0.0))
+            self._marks[key] = (count + 1, time.monotonic())
+            try:
+                put()
+            except BaseException:
+                self._release_locked(key)
+                raise
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._release_locked(key)
+
+    def _release_locked(self, key: str) -> None:
+        count, marked_at = self._marks.get(key, (0, 0.0))
+        if count > 1:
+            self._marks[key] = (count - 1, marked_at)
+        else:
+            self._marks.pop(key, None)
+
+    def _is_pending_locked(self, key: str) -> bool:
+        now = time.monotonic()
+        for stale in [k for k, (_, at) in self._marks.items() if now - at >= self.grace]:
+            del self._marks[stale]
+        return key in self._marks
+
+    def delete_if_idle(self, key: str, delete: Callable[[], object]) -> bool:
+        """Call ``delete`` unless ``key`` is in flight; returns whether it ran (blocking)."""
+        with self._lock:
+            if self._is_pending_locked(key):
+                return False
+            delete()
+            return True
+
+
+def create_upload_storage(kind: Optional[str] = None):
+    """Build the backend configured by UPLOAD_STORAGE (local or s3)."""
+    kind = kind or UPLOAD_STORAGE
+    if kind == "s3":
+        return S3Storage()
+    return LocalStorage()